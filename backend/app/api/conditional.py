@@ -0,0 +1,61 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+"""
+Conditional GET helpers (ETag / If-None-Match, Last-Modified / If-Modified-Since).
+
+Routes compute a cheap watermark first (a count and max(updated_at) over the
+caller's visible rows plus the process write counter), turn it into an ETag,
+and answer 304 before running their main query when the client already has
+that version. Tags are weak: the body is equivalent, not byte-identical, once
+compression is involved.
+
+Responses carry ``Cache-Control: private, no-cache`` and ``Vary: Authorization``
+so browsers revalidate on every use and shared caches never hand one user's
+scoped view to another.
+"""
+
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(json.dumps(parts, default=str, separators=(",", ":")).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive timestamps; they are stored in UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def is_fresh(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """True when the client's cached copy is current (If-None-Match wins over If-Modified-Since)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        opaque = etag.removeprefix("W/")
+        return any(
+            tag.strip() == "*" or tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, last_modified: datetime | None = None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
@@ -1,16 +1,35 @@
-from typing import Generator, Annotated
+from typing import AsyncGenerator, Generator, Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/token")
 
+# Token subject (email) -> detached User row. Shared by the audit middleware and
+# get_current_user so an authenticated request normally costs no users query.
+user_cache: TTLCache[str, User] = TTLCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+# Any ORM write to a user (register today, role/profile edits later) drops the cache.
+# User mutations are rare, so clearing everything beats tracking old/new emails.
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_cache(_mapper, _connection, _target) -> None:
+    user_cache.clear()
+
 
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
@@ -20,7 +39,54 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# For `async def` routes: queries are awaited, so a slow one doesn't stall the event loop.
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def decode_token_subject(token: str) -> str | None:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def load_user(db: Session, email: str) -> User | None:
+    user = user_cache.get(email)
+    if user is not None:
+        return user
+
+    user = db.query(User).filter(User.email == email).first()
+    if user is not None:
+        # Detach so the instance can be shared across requests and sessions.
+        db.expunge(user)
+        user_cache.set(email, user)
+    return user
+
+
+async def resolve_request_user(request: Request) -> User | None:
+    """Decode the bearer token once and keep the user on ``request.state``."""
+    if hasattr(request.state, "user"):
+        return request.state.user
+
+    user = None
+    auth_header = request.headers.get("Authorization", "")
+    if auth_header.startswith("Bearer "):
+        email = decode_token_subject(auth_header.split(" ", 1)[1].strip())
+        if email:
+            user = user_cache.get(email)
+            if user is None:
+                async with AsyncSessionLocal() as db:
+                    user = await db.run_sync(load_user, email)
+
+    request.state.user = user
+    return user
+
+
 def get_current_user(
+    request: Request,
     db: Annotated[Session, Depends(get_db)],
     token: Annotated[str, Depends(oauth2_scheme)],
 ) -> User:
@@ -30,17 +96,19 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str | None = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
+    # Normally already resolved by the audit middleware for this request.
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
+    email = decode_token_subject(token)
+    if email is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
+    user = load_user(db, email)
     if not user:
         raise credentials_exception
+    request.state.user = user
     return user
 
 
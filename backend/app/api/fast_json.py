@@ -0,0 +1,51 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+"""
+Fast JSON path for large list responses.
+
+The default path hands ORM objects (or dicts) to FastAPI, which validates every
+row against the ``response_model``, walks the result again with
+``jsonable_encoder`` and finally encodes it with the standard ``json`` module.
+Routes that opt in select plain column tuples instead, zip them into dicts
+keyed by the schema's field names and return ``fast_json(rows)``: orjson
+encodes the list in one pass, with ``Decimal`` as a string and ``datetime`` in
+ISO 8601 (``Z`` for UTC), i.e. byte-for-byte the shape Pydantic produces.
+
+The ``response_model`` stays on the route for the OpenAPI schema; FastAPI skips
+validation for a returned Response, so the route is responsible for handing
+over exactly the schema's fields.
+"""
+
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content: Any, response: Response | None = None) -> FastJSONResponse:
+    """Encode ``content`` with orjson, keeping headers already set on the route's injected ``response``."""
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-type")}
+    return FastJSONResponse(content, headers=headers)
+
+
+def rows_as_dicts(fields: list[str], rows) -> list[dict[str, Any]]:
+    return [dict(zip(fields, row)) for row in rows]
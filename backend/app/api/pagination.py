@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import literal
+
+"""
+Opaque keyset cursors.
+
+A cursor is the sort key of the last row on a page (for example
+``[duration_days, id]``), JSON-encoded and base64url'd so clients treat it as a
+token rather than something to construct. Values are tagged with their type so
+datetimes and decimals round-trip exactly and compare correctly in SQL.
+"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError
+        return [_decode_value(v) for v in values]
+    except (ValueError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_param(dialect: str, value: Any) -> Any:
+    """Bind a decoded cursor value so it compares equal to the stored column value."""
+    # SQLite keeps server-side timestamps (CURRENT_TIMESTAMP) as 'YYYY-MM-DD HH:MM:SS' text,
+    # but a bound datetime always renders microseconds, which would sort it after equal keys.
+    if dialect == "sqlite" and isinstance(value, datetime):
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+        return literal(value.strftime(fmt))
+    return value
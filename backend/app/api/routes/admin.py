@@ -0,0 +1,51 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_role
+from app.core.config import settings
+from app.core.profiler import sql_profiler
+from app.core.security import password_hasher
+from app.db.session import async_engine, engine, pool_status
+from app.services import chat_cache
+from app.services.audit_retention import audit_maintenance
+from app.services.audit_writer import audit_writer
+from app.services.llm_clients import llm_clients
+
+"""
+Admin operational views. ``/admin/db/pool`` reports this worker's database
+connection pools: configured size and overflow, connections checked in and
+out right now, and utilization (checked out / size + max overflow). Each
+uvicorn worker has its own pools, so the numbers are per process.
+
+``/admin/stats`` reports the same worker's background services: the audit
+queue and retention job, LLM provider clients, the assistant reply cache, the
+password hasher pool and the SQL profiler's per-route totals. These stay off
+the unauthenticated ``/health``: statement fingerprints reveal the schema.
+"""
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/db/pool")
+def db_pool(_user=Depends(require_role("admin"))) -> dict[str, Any]:
+    return {
+        "null_pool": settings.DB_NULL_POOL,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS or None,
+        "engines": {
+            "sync": pool_status(engine),
+            "async": pool_status(async_engine.sync_engine),
+        },
+    }
+
+
+@router.get("/stats")
+def stats(_user=Depends(require_role("admin"))) -> dict[str, Any]:
+    return {
+        "audit_queue": audit_writer.stats(),
+        "audit_retention": audit_maintenance.stats(),
+        "llm_providers": llm_clients.snapshot(),
+        "assistant_cache": chat_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "sql_profile": sql_profiler.stats(),
+    }
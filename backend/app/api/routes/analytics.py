@@ -1,96 +1,310 @@
-from datetime import datetime, time, timezone
+from datetime import date, datetime, time, timezone
+from typing import Literal
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy import Date, Integer, case, cast, func, literal, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, require_role
+from app.api import fast_json
+from app.api.conditional import is_fresh, not_modified, validator_headers, weak_etag
+from app.api.deps import get_async_db, require_role
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.cache import VersionedCache
+from app.db.data_version import portfolio_version, portfolio_watermark
 from app.models.audit import ProjectUpdate
 from app.models.project import Project
-from app.schemas.analytics import CountByKey, FundingByKey, PortfolioSnapshot, ProjectCycle
+from app.schemas.analytics import (
+    CountByKey,
+    CycleDurationStats,
+    FundingByKey,
+    FundingTimeseries,
+    FundingTimeseriesPoint,
+    PortfolioSnapshot,
+    ProjectCycle,
+    ProjectCyclePage,
+)
+from app.services import funding
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 
-# A private helper function designed to take any column 
-# and count how many projects belong to each unique value in that column.
+_snapshot_cache: VersionedCache[str, bytes] = VersionedCache()
 
-# SELECT column, COUNT(id) FROM projects GROUP BY column;
-def _group_count(db: Session, col):
-    rows = db.query(col, func.count(Project.id)).group_by(col).all()
-    return [CountByKey(key=str(k), count=int(c)) for k, c in rows]
-# The database returns a list of tuples (e.g., [("High", 5), ("Low", 10)])
 
-
-def _funding_by_domain(db: Session) -> list[FundingByKey]:
-    rows = (
-        db.query(Project.domain, func.coalesce(func.sum(Project.funding_amount_sgd), 0))
-        .group_by(Project.domain)
-        .all()
+def _aggregate_columns():
+    return (
+        func.count(Project.id).label("total"),
+        func.coalesce(func.sum(case((Project.status == "Active", 1), else_=0)), 0).label("active"),
+        func.coalesce(func.sum(Project.funding_amount_sgd), 0).label("spent"),
     )
-    return [FundingByKey(key=str(k), amount_sgd=float(v or 0)) for k, v in rows]
 
 
-def _project_cycles(db: Session) -> list[ProjectCycle]:
-    projects = db.query(Project).order_by(Project.created_at.desc()).all()
-    completed_rows = (
-        db.query(ProjectUpdate.project_id, func.max(ProjectUpdate.created_at))
-        .filter(ProjectUpdate.status == "Completed")
+# Totals, per-institution and per-domain aggregates in one statement.
+# Each row is (dimension, key, total, active, spent) with dimension in {None, "institution", "domain"}.
+def _portfolio_aggregates(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        # SELECT ... GROUP BY GROUPING SETS ((institution), (domain), ())
+        g_inst = func.grouping(Project.institution)
+        g_dom = func.grouping(Project.domain)
+        rows = db.execute(
+            select(g_inst, g_dom, Project.institution, Project.domain, *_aggregate_columns()).group_by(
+                func.grouping_sets(tuple_(Project.institution), tuple_(Project.domain), tuple_())
+            )
+        ).all()
+        for gi, gd, inst, dom, total, active, spent in rows:
+            if gi == 0:
+                yield "institution", inst, total, active, spent
+            elif gd == 0:
+                yield "domain", dom, total, active, spent
+            else:
+                yield None, None, total, active, spent
+        return
+
+    # Same result elsewhere: the three grouping sets as one UNION ALL statement.
+    totals = select(literal(None).label("dimension"), literal(None).label("key"), *_aggregate_columns())
+    by_inst = select(
+        literal("institution"), Project.institution, *_aggregate_columns()
+    ).group_by(Project.institution)
+    by_dom = select(literal("domain"), Project.domain, *_aggregate_columns()).group_by(Project.domain)
+    yield from db.execute(union_all(totals, by_inst, by_dom)).all()
+
+
+def _as_date(dialect: str, expr):
+    # SQLite keeps timestamps as text; date() trims them to YYYY-MM-DD.
+    return func.date(expr) if dialect == "sqlite" else cast(expr, Date)
+
+
+def _days_between(dialect: str, start, end):
+    if dialect == "postgresql":
+        return end - start  # date - date is an integer number of days
+    if dialect == "sqlite":
+        return cast(func.julianday(end) - func.julianday(start), Integer)
+    return func.datediff(end, start)
+
+
+# One row per project with its cycle computed in SQL:
+# a cycle starts at created_at and ends at the latest "Completed" update (falling back to
+# end_date), or runs until today while the project has no end_date.
+def _cycles_subquery(db: Session, domain: str | None = None, status: str | None = None):
+    dialect = db.get_bind().dialect.name
+    completed = (
+        select(ProjectUpdate.project_id, func.max(ProjectUpdate.created_at).label("completed_at"))
+        .where(ProjectUpdate.status == "Completed")
         .group_by(ProjectUpdate.project_id)
-        .all()
+        .subquery()
     )
-    completed_at_by_project = {project_id: completed_at for project_id, completed_at in completed_rows}
-
-    cycles: list[ProjectCycle] = []
-
-    for p in projects:
-        start_time = p.created_at or datetime.now(timezone.utc)
-        if start_time.tzinfo is None:
-            start_time = start_time.replace(tzinfo=timezone.utc)
-
-        end_time = None
-        if p.end_date is not None:
-            end_time = completed_at_by_project.get(p.id)
-            if end_time is None:
-                end_time = datetime.combine(p.end_date, time.max, tzinfo=timezone.utc)
-        if end_time is not None and end_time.tzinfo is None:
-            end_time = end_time.replace(tzinfo=timezone.utc)
-
-        duration_end = end_time or datetime.now(timezone.utc)
-        duration_days = max((duration_end.date() - start_time.date()).days, 0)
-
-        cycles.append(
-            ProjectCycle(
-                id=p.id,
-                title=p.title,
-                domain=p.domain,
-                status=p.status,
-                start_time=start_time.isoformat(),
-                end_time=end_time.isoformat() if end_time else None,
-                duration_days=duration_days,
-                spent_sgd=float(p.funding_amount_sgd or 0),
-            )
+
+    end_day = case(
+        (Project.end_date.is_(None), func.current_date()),
+        else_=func.coalesce(_as_date(dialect, completed.c.completed_at), _as_date(dialect, Project.end_date)),
+    )
+    days = _days_between(dialect, _as_date(dialect, Project.created_at), end_day)
+
+    query = select(
+        Project.id,
+        Project.title,
+        Project.domain,
+        Project.status,
+        Project.created_at,
+        Project.end_date,
+        completed.c.completed_at,
+        func.coalesce(Project.funding_amount_sgd, 0).label("spent_sgd"),
+        case((days < 0, 0), else_=days).label("duration_days"),
+    ).outerjoin(completed, completed.c.project_id == Project.id)
+
+    if domain:
+        query = query.where(Project.domain == domain)
+    if status:
+        query = query.where(Project.status == status)
+    return query.subquery()
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _to_cycle(row) -> ProjectCycle:
+    end_time = None
+    if row.end_date is not None:
+        end_time = _as_utc(row.completed_at) or datetime.combine(row.end_date, time.max, tzinfo=timezone.utc)
+    start_time = _as_utc(row.created_at) or datetime.now(timezone.utc)
+
+    return ProjectCycle(
+        id=row.id,
+        title=row.title,
+        domain=row.domain,
+        status=row.status,
+        start_time=start_time.isoformat(),
+        end_time=end_time.isoformat() if end_time else None,
+        duration_days=int(row.duration_days or 0),
+        spent_sgd=float(row.spent_sgd or 0),
+    )
+
+
+def _percentile(sorted_values: list[int], q: float) -> float:
+    # Linear interpolation, matching Postgres percentile_cont.
+    pos = (len(sorted_values) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def _cycle_duration_stats(db: Session) -> list[CycleDurationStats]:
+    cycles = _cycles_subquery(db)
+    duration = cycles.c.duration_days
+
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(
+            select(
+                cycles.c.domain,
+                func.count(),
+                func.percentile_cont(0.5).within_group(duration),
+                func.percentile_cont(0.9).within_group(duration),
+                func.max(duration),
+            ).group_by(cycles.c.domain)
+        ).all()
+        return [
+            CycleDurationStats(key=str(k), count=int(n), p50_days=float(p50), p90_days=float(p90), max_days=int(mx))
+            for k, n, p50, p90, mx in rows
+        ]
+
+    # No ordered-set aggregates elsewhere: stream (domain, duration) pre-sorted and reduce here.
+    by_domain: dict[str, list[int]] = {}
+    for key, days in db.execute(select(cycles.c.domain, duration).order_by(cycles.c.domain, duration)):
+        by_domain.setdefault(str(key), []).append(int(days or 0))
+    return [
+        CycleDurationStats(
+            key=key,
+            count=len(values),
+            p50_days=_percentile(values, 0.5),
+            p90_days=_percentile(values, 0.9),
+            max_days=values[-1],
         )
+        for key, values in by_domain.items()
+    ]
+
+
+@router.get("/project-cycles", response_model=ProjectCyclePage)
+async def project_cycles(
+    db: AsyncSession = Depends(get_async_db),
+    _user=Depends(require_role("management", "admin")),
+    sort: Literal["duration", "spend"] = "duration",
+    order: Literal["desc", "asc"] = "desc",
+    domain: str | None = None,
+    status: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+):
+    cycles = _cycles_subquery(db, domain=domain, status=status)
+    sort_col = cycles.c.duration_days if sort == "duration" else cycles.c.spent_sgd
+    key = tuple_(sort_col, cycles.c.id)
 
-    return cycles
+    query = select(cycles)
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, 2)
+        bound = tuple_(literal(last_value, sort_col.type), literal(last_id))
+        query = query.where(key < bound if order == "desc" else key > bound)
+
+    if order == "desc":
+        query = query.order_by(sort_col.desc(), cycles.c.id.desc())
+    else:
+        query = query.order_by(sort_col.asc(), cycles.c.id.asc())
+
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.duration_days if sort == "duration" else last.spent_sgd, last.id)
+
+    return ProjectCyclePage(items=[_to_cycle(r) for r in rows], next_cursor=next_cursor)
+
+
+def _compute_snapshot(db: Session) -> PortfolioSnapshot:
+    total = active = total_spent = 0
+    by_institution: list[CountByKey] = []
+    by_domain: list[CountByKey] = []
+    funding_by_domain: list[FundingByKey] = []
+
+    for dimension, key, count, active_count, spent in _portfolio_aggregates(db):
+        if dimension == "institution":
+            by_institution.append(CountByKey(key=str(key), count=int(count)))
+        elif dimension == "domain":
+            by_domain.append(CountByKey(key=str(key), count=int(count)))
+            funding_by_domain.append(FundingByKey(key=str(key), amount_sgd=float(spent or 0)))
+        else:
+            total, active, total_spent = count, active_count, spent
+
+    return PortfolioSnapshot(
+        total_projects=int(total or 0),
+        active_projects=int(active or 0),
+        total_spent_sgd=float(total_spent or 0),
+        by_institution=by_institution,
+        by_domain=by_domain,
+        funding_by_domain=funding_by_domain,
+        cycle_duration_by_domain=_cycle_duration_stats(db),
+    )
 
 
 # The route for fetching the dashboard data.
+# Served from a cache keyed on the portfolio write counter, so repeat loads run no
+# queries until a project, update or funding event changes. The date is part of the
+# version because open project cycles (and their percentiles) are measured up to today.
+# A client revalidating with If-None-Match gets 304 after one watermark query.
+# The cache holds the encoded JSON body, so a hit costs no serialization either.
 @router.get("/portfolio", response_model=PortfolioSnapshot)
-def portfolio_snapshot(
-    db: Session = Depends(get_db),
+async def portfolio_snapshot(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(require_role("management", "admin")),
 ):
-    total = db.query(func.count(Project.id)).scalar() or 0 # Counts the total number of project IDs.
-    active = db.query(func.count(Project.id)).filter(Project.status == "Active").scalar() or 0
-    total_spent = db.query(func.coalesce(func.sum(Project.funding_amount_sgd), 0)).scalar() or 0
+    # The database watermark also catches writes made by other worker processes.
+    watermark = (await db.execute(portfolio_watermark())).one()
+    version = (*watermark, portfolio_version.current, date.today())
+    etag = weak_etag("portfolio", *version)
+    if is_fresh(request, etag):
+        return not_modified(etag)
 
-    return PortfolioSnapshot(
-        total_projects=int(total),
-        active_projects=int(active),
-        total_spent_sgd=float(total_spent),
-        by_institution=_group_count(db, Project.institution),
-        by_domain=_group_count(db, Project.domain),
-        funding_by_domain=_funding_by_domain(db),
-        project_cycles=_project_cycles(db),
+    body = _snapshot_cache.get("portfolio", version)
+    if body is None:
+        snapshot = await db.run_sync(_compute_snapshot)
+        body = fast_json.dumps(snapshot.model_dump())
+        _snapshot_cache.set("portfolio", version, body)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag))
+
+
+# Spend over time from the monthly funding rollup: one row per month is read, however
+# many funding events were recorded. Quarters and years are summed from the months.
+@router.get("/funding-timeseries", response_model=FundingTimeseries)
+async def funding_timeseries(
+    db: AsyncSession = Depends(get_async_db),
+    _user=Depends(require_role("management", "admin")),
+    period: Literal["month", "quarter", "year"] = "month",
+    domain: str | None = None,
+    project_id: int | None = None,
+    start: date | None = Query(default=None, description="first period to include (any day inside it)"),
+    end: date | None = Query(default=None, description="last period to include (any day inside it)"),
+):
+    points = await db.run_sync(
+        lambda sync_db: funding.funding_timeseries(
+            sync_db, period=period, domain=domain, project_id=project_id, start=start, end=end
+        )
+    )
+    return FundingTimeseries(
+        period=period,
+        domain=domain,
+        project_id=project_id,
+        points=[
+            FundingTimeseriesPoint(
+                period=p.period,
+                period_start=p.period_start,
+                amount_sgd=float(p.amount_sgd),
+                cumulative_sgd=float(p.cumulative_sgd),
+                events=p.events,
+            )
+            for p in points
+        ],
     )
@@ -1,24 +1,33 @@
+import asyncio
 import json
+import time
 from collections import Counter
-from datetime import date, datetime
-from decimal import Decimal
-from typing import Any
+from contextlib import aclosing
+from typing import Any, AsyncIterator
 
-import httpx
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user
 from app.core.config import settings
+from app.core.metrics import ASSISTANT_REPLIES
+from app.db.data_version import portfolio_watermark
+from app.db.session import SessionLocal
 from app.models.project import Project
 from app.models.user import User
 from app.schemas.assistant import ChatRequest, ChatResponse
+from app.services import chat_cache
+from app.services.llm_clients import llm_clients
+from app.services.retrieval import select_context_rows
 
 router = APIRouter(prefix="/assistant", tags=["assistant"])
 
 MODE_OPENAI = 1
 MODE_OLLAMA = 2
 MODE_LOCAL = 3
+PROVIDER_BY_MODE = {MODE_OPENAI: "openai", MODE_OLLAMA: "ollama", MODE_LOCAL: "local"}
 
 
 def _format_counter(counter: Counter[str]) -> str:
@@ -27,37 +36,50 @@ def _format_counter(counter: Counter[str]) -> str:
     return ", ".join(f"{key}: {value}" for key, value in counter.most_common())
 
 
-def _serialize_scalar(value: Any) -> Any:
-    if isinstance(value, (datetime, date)):
-        return value.isoformat()
-    if isinstance(value, Decimal):
-        return float(value)
-    return value
-
-
-def _project_to_dict(project: Project) -> dict[str, Any]:
-    # Keep this aligned to the real projects table schema by reading SQLAlchemy columns.
-    return {
-        column.name: _serialize_scalar(getattr(project, column.name))
-        for column in Project.__table__.columns
-    }
-
-
-def _build_portfolio_context(db: Session, user: User) -> dict[str, Any]:
-    query = db.query(Project)
-    if user.role == "researcher":
-        query = query.filter(Project.owner_id == user.id)
-
-    projects = query.order_by(Project.updated_at.desc()).all()
-    total = len(projects)
-    active = sum(1 for p in projects if (p.status or "").lower() == "active")
+def _select_context_rows(message: str, history: list[dict[str, str]], owner_id: int | None) -> list[dict[str, Any]]:
+    with SessionLocal() as db:
+        return select_context_rows(
+            db,
+            message,
+            history,
+            owner_id=owner_id,
+            top_k=settings.ASSISTANT_CONTEXT_TOP_K,
+            token_budget=settings.ASSISTANT_CONTEXT_TOKEN_BUDGET,
+        )
 
-    by_domain = Counter((p.domain or "Unknown") for p in projects)
-    by_stage = Counter((p.maturity_stage or "Unknown") for p in projects)
-    total_spent = sum(float(p.funding_amount_sgd or 0) for p in projects)
 
-    latest_titles = [p.title for p in projects[:5]]
-    project_rows = [_project_to_dict(p) for p in projects]
+async def _build_portfolio_context(
+    db: AsyncSession, user: User, message: str, history: list[dict[str, str]]
+) -> dict[str, Any]:
+    owner_id = user.id if user.role == "researcher" else None
+
+    # Aggregates come from one grouped query instead of loading every project.
+    grouped = select(
+        Project.domain,
+        Project.maturity_stage,
+        func.count(Project.id),
+        func.sum(case((func.lower(Project.status) == "active", 1), else_=0)),
+        func.coalesce(func.sum(Project.funding_amount_sgd), 0),
+    ).group_by(Project.domain, Project.maturity_stage)
+    latest = select(Project.title).order_by(Project.updated_at.desc()).limit(5)
+    if owner_id is not None:
+        grouped = grouped.where(Project.owner_id == owner_id)
+        latest = latest.where(Project.owner_id == owner_id)
+
+    by_domain: Counter[str] = Counter()
+    by_stage: Counter[str] = Counter()
+    total = active = 0
+    total_spent = 0.0
+    for domain, stage, count, active_count, spent in await db.execute(grouped):
+        by_domain[domain or "Unknown"] += count
+        by_stage[stage or "Unknown"] += count
+        total += count
+        active += int(active_count or 0)
+        total_spent += float(spent or 0)
+
+    # Retrieval is CPU work (tokenizing and scoring, plus rebuilding the index after a write),
+    # so it runs in a worker thread rather than on the event loop.
+    project_rows = await asyncio.to_thread(_select_context_rows, message, history, owner_id)
 
     return {
         "user_role": user.role,
@@ -67,7 +89,7 @@ def _build_portfolio_context(db: Session, user: User) -> dict[str, Any]:
         "domain": _format_counter(by_domain),
         "stage": _format_counter(by_stage),
         "total_spent": total_spent,
-        "latest_titles": latest_titles,
+        "latest_titles": list(await db.scalars(latest)),
         "projects": project_rows,
     }
 
@@ -122,8 +144,9 @@ def _build_system_prompt(context: dict[str, Any]) -> str:
         f"Portfolio context: total={context['total']}, active={context['active']}, "
         f"domain=({context['domain']}), maturity=({context['stage']}), "
         f"total_spent_sgd={context['total_spent']:.2f}.\n"
-        "The following JSON contains all visible rows from the projects table. "
-        "Use it as source of truth when answering project-specific questions.\n"
+        f"The following JSON contains the {len(context['projects'])} of {context['total']} visible projects "
+        "most relevant to this conversation. Use it as source of truth when answering project-specific "
+        "questions, and use the portfolio context above for totals.\n"
         f"projects_table_rows={projects_json}"
     )
 
@@ -148,26 +171,62 @@ def _extract_openai_content(data: dict[str, Any]) -> str | None:
     return None
 
 
-async def _call_openai(messages: list[dict[str, str]]) -> str | None:
+# Each provider request is (endpoint, headers, body); None when the provider isn't configured.
+ProviderRequest = tuple[str, dict[str, str], dict[str, Any]]
+
+
+def _openai_request(messages: list[dict[str, str]]) -> ProviderRequest | None:
     if not settings.OPENAI_API_KEY:
         return None
+    headers = {
+        "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
+        "Content-Type": "application/json",
+    }
+    body = {
+        "model": settings.OPENAI_MODEL,
+        "messages": messages,
+        "temperature": 0.2,
+    }
+    return "https://api.openai.com/v1/chat/completions", headers, body
+
+
+def _ollama_request(messages: list[dict[str, str]]) -> ProviderRequest:
+    base_url = settings.OLLAMA_BASE_URL.rstrip("/")
+    endpoint = base_url if base_url.endswith("/api/chat") else f"{base_url}/api/chat"
+    body = {
+        "model": settings.OLLAMA_MODEL,
+        "messages": messages,
+        "stream": False,
+        "options": {"temperature": 0.2},
+    }
+    return endpoint, {}, body
+
+
+def _local_request(messages: list[dict[str, str]]) -> ProviderRequest:
+    base_url = settings.LOCAL_LLM_BASE_URL.rstrip("/")
+    endpoint = base_url if base_url.endswith("/chat/completions") else f"{base_url}/chat/completions"
+
+    headers = {"Content-Type": "application/json"}
+    if settings.LOCAL_LLM_API_KEY:
+        headers["Authorization"] = f"Bearer {settings.LOCAL_LLM_API_KEY}"
+    body = {
+        "model": settings.LOCAL_LLM_MODEL,
+        "messages": messages,
+        "temperature": 0.2,
+    }
+    return endpoint, headers, body
+
+
+async def _call_openai(messages: list[dict[str, str]]) -> str | None:
+    request = _openai_request(messages)
+    if request is None:
+        return None
+    endpoint, headers, body = request
 
     try:
-        async with httpx.AsyncClient(timeout=settings.LLM_TIMEOUT_SECONDS) as client:
-            resp = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.OPENAI_MODEL,
-                    "messages": messages,
-                    "temperature": 0.2,
-                },
-            )
-            resp.raise_for_status()
-            return _extract_openai_content(resp.json())
+        resp = await llm_clients.post("openai", endpoint, headers=headers, json=body)
+        resp.raise_for_status()
+        return _extract_openai_content(resp.json())
     except Exception:
         return None
 
@@ -175,25 +234,15 @@ async def _call_openai(messages: list[dict[str, str]]) -> str | None:
 
 
 async def _call_ollama(messages: list[dict[str, str]]) -> str | None:
-    base_url = settings.OLLAMA_BASE_URL.rstrip("/")
-    endpoint = base_url if base_url.endswith("/api/chat") else f"{base_url}/api/chat"
+    endpoint, headers, body = _ollama_request(messages)
 
     try:
-        async with httpx.AsyncClient(timeout=settings.LLM_TIMEOUT_SECONDS) as client:
-            resp = await client.post(
-                endpoint,
-                json={
-                    "model": settings.OLLAMA_MODEL,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {"temperature": 0.2},
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            content = (data.get("message") or {}).get("content")
-            if isinstance(content, str) and content.strip():
-                return content.strip()
+        resp = await llm_clients.post("ollama", endpoint, headers=headers, json=body)
+        resp.raise_for_status()
+        data = resp.json()
+        content = (data.get("message") or {}).get("content")
+        if isinstance(content, str) and content.strip():
+            return content.strip()
     except Exception:
         return None
 
@@ -201,42 +250,129 @@ async def _call_ollama(messages: list[dict[str, str]]) -> str | None:
 
 
 async def _call_local(messages: list[dict[str, str]]) -> str | None:
-    base_url = settings.LOCAL_LLM_BASE_URL.rstrip("/")
-    endpoint = base_url if base_url.endswith("/chat/completions") else f"{base_url}/chat/completions"
-
-    headers = {"Content-Type": "application/json"}
-    if settings.LOCAL_LLM_API_KEY:
-        headers["Authorization"] = f"Bearer {settings.LOCAL_LLM_API_KEY}"
+    endpoint, headers, body = _local_request(messages)
 
     try:
-        async with httpx.AsyncClient(timeout=settings.LLM_TIMEOUT_SECONDS) as client:
-            resp = await client.post(
-                endpoint,
-                headers=headers,
-                json={
-                    "model": settings.LOCAL_LLM_MODEL,
-                    "messages": messages,
-                    "temperature": 0.2,
-                },
-            )
-            resp.raise_for_status()
-            return _extract_openai_content(resp.json())
+        resp = await llm_clients.post("local", endpoint, headers=headers, json=body)
+        resp.raise_for_status()
+        return _extract_openai_content(resp.json())
     except Exception:
         return None
 
     return None
 
 
+async def _stream_openai_compatible(provider: str, request: ProviderRequest | None) -> AsyncIterator[str]:
+    # OpenAI and OpenAI-compatible local servers stream SSE "data: {...}" lines ending with "data: [DONE]".
+    # Lines are read to the end of the body (not just to [DONE]) so the connection is reused.
+    if request is None:
+        return
+    endpoint, headers, body = request
+    async with llm_clients.stream(provider, endpoint, headers=headers, json={**body, "stream": True}) as resp:
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                continue
+            delta = ((json.loads(data).get("choices") or [{}])[0].get("delta") or {}).get("content")
+            if isinstance(delta, str) and delta:
+                yield delta
+
+
+async def _stream_ollama(messages: list[dict[str, str]]) -> AsyncIterator[str]:
+    # Ollama streams one JSON object per line, the last one with "done": true.
+    endpoint, headers, body = _ollama_request(messages)
+    async with llm_clients.stream("ollama", endpoint, headers=headers, json={**body, "stream": True}) as resp:
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            content = (data.get("message") or {}).get("content")
+            if isinstance(content, str) and content:
+                yield content
+
+
+def _provider_stream(mode: int, messages: list[dict[str, str]]) -> tuple[str, AsyncIterator[str]]:
+    if mode == MODE_OLLAMA:
+        return "ollama", _stream_ollama(messages)
+    if mode == MODE_LOCAL:
+        return "local", _stream_openai_compatible("local", _local_request(messages))
+    return "openai", _stream_openai_compatible("openai", _openai_request(messages))
+
+
+def _ndjson(event: dict[str, Any]) -> bytes:
+    return (json.dumps(event, ensure_ascii=False) + "\n").encode()
+
+
+async def _stream_reply(
+    mode: int, messages: list[dict[str, str]], message: str, context: dict[str, Any], cache_key: tuple | None
+) -> AsyncIterator[bytes]:
+    provider, tokens = _provider_stream(mode, messages)
+    started = time.perf_counter()
+    ttft_ms: float | None = None
+    parts: list[str] = []
+
+    try:
+        async with aclosing(tokens):
+            async for token in tokens:
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    llm_clients.record_ttft(provider, ttft_ms)
+                parts.append(token)
+                yield _ndjson({"type": "token", "content": token})
+    except Exception:
+        if ttft_ms is not None:
+            # Part of the answer is already on screen, so don't append an unrelated fallback.
+            ASSISTANT_REPLIES.labels(provider, "false").inc()
+            yield _ndjson({"type": "error", "detail": "The assistant stopped responding mid-answer"})
+            yield _ndjson({"type": "done", "provider": provider, "ttft_ms": round(ttft_ms, 1), "cached": False})
+            return
+
+    if ttft_ms is None:
+        # Provider unavailable or failed before its first token.
+        provider = "fallback"
+        ttft_ms = (time.perf_counter() - started) * 1000
+        yield _ndjson({"type": "token", "content": _fallback_reply(message, context)})
+    else:
+        chat_cache.put(cache_key, "".join(parts).strip(), provider)
+
+    ASSISTANT_REPLIES.labels(provider, "false").inc()
+    yield _ndjson({"type": "done", "provider": provider, "ttft_ms": round(ttft_ms, 1), "cached": False})
+
+
+async def _stream_cached(hit: chat_cache.CachedReply) -> AsyncIterator[bytes]:
+    ASSISTANT_REPLIES.labels(hit.provider, "true").inc()
+    yield _ndjson({"type": "token", "content": hit.reply})
+    yield _ndjson({"type": "done", "provider": hit.provider, "ttft_ms": 0.0, "cached": True})
+
+
+async def _parse_chat(
+    payload: ChatRequest, user: User, db: AsyncSession
+) -> tuple[list[dict[str, str]], int, tuple | None]:
+    history = [{"role": msg.role, "content": msg.content} for msg in payload.history]
+    mode = _normalize_mode(payload.mode if payload.mode is not None else settings.LLM_MODE)
+    if not chat_cache.cacheable(payload.message, history):
+        return history, mode, None
+    # The database watermark catches portfolio writes made by other worker processes.
+    watermark = tuple((await db.execute(portfolio_watermark())).one())
+    return history, mode, chat_cache.cache_key(payload.message, history, user, PROVIDER_BY_MODE[mode], watermark)
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     payload: ChatRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user: User = Depends(get_current_user),
 ):
-    context = _build_portfolio_context(db, user)
-    history = [{"role": msg.role, "content": msg.content} for msg in payload.history]
+    history, mode, cache_key = await _parse_chat(payload, user, db)
+    hit = chat_cache.get(cache_key)
+    if hit is not None:
+        ASSISTANT_REPLIES.labels(hit.provider, "true").inc()
+        return ChatResponse(reply=hit.reply, provider=hit.provider, cached=True)
+
+    context = await _build_portfolio_context(db, user, payload.message, history)
     messages = _build_messages(payload.message, history, context)
-    mode = _normalize_mode(payload.mode if payload.mode is not None else settings.LLM_MODE)
 
     llm_reply: str | None = None
     provider = "fallback"
@@ -252,6 +388,39 @@ async def chat(
         provider = "local"
 
     if llm_reply:
+        chat_cache.put(cache_key, llm_reply, provider)
+        ASSISTANT_REPLIES.labels(provider, "false").inc()
         return ChatResponse(reply=llm_reply, provider=provider)
 
+    ASSISTANT_REPLIES.labels("fallback", "false").inc()
     return ChatResponse(reply=_fallback_reply(payload.message, context), provider="fallback")
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    payload: ChatRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: User = Depends(get_current_user),
+):
+    """Same as ``/chat`` but streams the reply as newline-delimited JSON events.
+
+    ``{"type": "token", "content": ...}`` for each chunk as the provider produces it,
+    then ``{"type": "done", "provider": ..., "ttft_ms": ..., "cached": ...}``. If the
+    provider fails before its first token the fallback reply is sent as a single token
+    instead; a failure after that ends the stream with ``{"type": "error", ...}`` before
+    ``done``. A cached reply is sent as a single token.
+    """
+    history, mode, cache_key = await _parse_chat(payload, user, db)
+    hit = chat_cache.get(cache_key)
+    if hit is not None:
+        body = _stream_cached(hit)
+    else:
+        # The portfolio context is built here, while the request's DB session is still open.
+        context = await _build_portfolio_context(db, user, payload.message, history)
+        messages = _build_messages(payload.message, history, context)
+        body = _stream_reply(mode, messages, payload.message, context, cache_key)
+    return StreamingResponse(
+        body,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
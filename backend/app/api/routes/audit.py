@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Select, false, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_async_db, require_role
+from app.api.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
+from app.api.pagination import decode_cursor, encode_cursor, keyset_param
+from app.db.session import SessionLocal, engine
+from app.models.audit import AuditLog, ProjectFundingEvent, ProjectUpdate
+from app.schemas.audit import AuditLogPage, FundingEventPage, ProjectUpdatePage
+
+"""
+Admin read access to the audit trail: AuditLog rows, project updates and
+funding events across all projects.
+
+Every listing filters on actor, action, entity and a created_at range and is
+paged newest-first with a (created_at, id) keyset cursor, so page N costs the
+same as page 1 and uses the (actor_user_id, created_at) / (entity_type,
+entity_id, created_at) / created_at indexes.
+
+``/audit/{source}/export`` streams the same filtered rows oldest-first as NDJSON
+or CSV (optionally gzipped). Rows are fetched ``yield_per`` at a time from a server-side cursor and
+written out chunk by chunk, so memory stays flat however many rows match.
+"""
+
+router = APIRouter(prefix="/audit", tags=["audit"])
+
+Source = Literal["logs", "project-updates", "funding-events"]
+
+
+@dataclass(frozen=True)
+class _SourceSpec:
+    model: Any
+    actor: Any  # user column
+    action: Any | None  # what "action" filters on, if anything
+    entity_type: Any | None  # None: every row is about a Project
+    entity_id: Any
+
+
+SOURCES: dict[str, _SourceSpec] = {
+    "logs": _SourceSpec(AuditLog, AuditLog.actor_user_id, AuditLog.action, AuditLog.entity_type, AuditLog.entity_id),
+    "project-updates": _SourceSpec(
+        ProjectUpdate, ProjectUpdate.author_user_id, ProjectUpdate.status, None, ProjectUpdate.project_id
+    ),
+    "funding-events": _SourceSpec(
+        ProjectFundingEvent, ProjectFundingEvent.author_user_id, None, None, ProjectFundingEvent.project_id
+    ),
+}
+
+
+@dataclass
+class AuditFilters:
+    actor_user_id: int | None = None
+    action: str | None = None
+    entity_type: str | None = None
+    entity_id: int | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+
+def audit_filters(
+    actor_user_id: int | None = Query(default=None, description="User who made the change"),
+    action: str | None = Query(default=None, description="Audit action (logs) or update status (project-updates)"),
+    entity_type: str | None = Query(default=None, description="e.g. Project, User, API"),
+    entity_id: int | None = Query(default=None, description="Entity id; the project id for updates and funding"),
+    since: datetime | None = Query(default=None, description="created_at >= since"),
+    until: datetime | None = Query(default=None, description="created_at < until"),
+) -> AuditFilters:
+    return AuditFilters(actor_user_id, action, entity_type, entity_id, since, until)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Timestamps are stored in UTC; SQLite compares them as text, so offsets must be applied first.
+    return value.astimezone(timezone.utc) if value.tzinfo else value
+
+
+def _filtered(source: str, filters: AuditFilters, dialect: str) -> tuple[Select, _SourceSpec]:
+    spec = SOURCES[source]
+    model = spec.model
+    query = select(*model.__table__.columns)
+
+    if filters.actor_user_id is not None:
+        query = query.where(spec.actor == filters.actor_user_id)
+    if filters.action:
+        if spec.action is None:
+            raise HTTPException(status_code=400, detail=f"action does not apply to {source}")
+        query = query.where(spec.action == filters.action)
+    if filters.entity_type:
+        if spec.entity_type is not None:
+            query = query.where(spec.entity_type == filters.entity_type)
+        elif filters.entity_type != "Project":
+            query = query.where(false())
+    if filters.entity_id is not None:
+        query = query.where(spec.entity_id == filters.entity_id)
+    if filters.since is not None:
+        query = query.where(model.created_at >= keyset_param(dialect, _as_utc(filters.since)))
+    if filters.until is not None:
+        query = query.where(model.created_at < keyset_param(dialect, _as_utc(filters.until)))
+    return query, spec
+
+
+async def _page(db: AsyncSession, source: str, filters: AuditFilters, limit: int, cursor: str | None):
+    dialect = db.get_bind().dialect.name
+    query, spec = _filtered(source, filters, dialect)
+    model = spec.model
+    if cursor:
+        last_created, last_id = decode_cursor(cursor, 2)
+        query = query.where(
+            tuple_(model.created_at, model.id) < tuple_(keyset_param(dialect, last_created), last_id)
+        )
+
+    rows = (await db.execute(query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [row._asdict() for row in rows], next_cursor
+
+
+@router.get("/logs", response_model=AuditLogPage)
+async def list_audit_logs(
+    db: AsyncSession = Depends(get_async_db),
+    _user=Depends(require_role("admin")),
+    filters: AuditFilters = Depends(audit_filters),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+):
+    items, next_cursor = await _page(db, "logs", filters, limit, cursor)
+    return AuditLogPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/project-updates", response_model=ProjectUpdatePage)
+async def list_project_updates(
+    db: AsyncSession = Depends(get_async_db),
+    _user=Depends(require_role("admin")),
+    filters: AuditFilters = Depends(audit_filters),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+):
+    items, next_cursor = await _page(db, "project-updates", filters, limit, cursor)
+    return ProjectUpdatePage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/funding-events", response_model=FundingEventPage)
+async def list_funding_events(
+    db: AsyncSession = Depends(get_async_db),
+    _user=Depends(require_role("admin")),
+    filters: AuditFilters = Depends(audit_filters),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+):
+    items, next_cursor = await _page(db, "funding-events", filters, limit, cursor)
+    return FundingEventPage(items=items, next_cursor=next_cursor)
+
+
+def _export_batches(query: Select):
+    # Opens its own session: the request's dependencies are closed before a streamed body is sent.
+    with SessionLocal() as db:
+        result = db.execute(query, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        yield from result.partitions()
+
+
+# Plain `def` route: the body is produced by a sync generator, which Starlette iterates in the threadpool.
+@router.get("/{source}/export")
+def export_audit(
+    source: Source,
+    _user=Depends(require_role("admin")),
+    filters: AuditFilters = Depends(audit_filters),
+    format: ExportFormat = "ndjson",
+):
+    query, spec = _filtered(source, filters, engine.dialect.name)
+    query = query.order_by(spec.model.created_at, spec.model.id)
+    columns = [c.name for c in query.selected_columns]
+    return export_response(columns, _export_batches(query), format, f"audit-{source}")
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, require_role
-from app.core.security import hash_password, verify_password, create_access_token
+from app.api.deps import get_async_db, get_db, require_role
+from app.api.fast_json import fast_json, rows_as_dicts
+from app.core.security import create_access_token, password_hasher
 from app.models.audit import AuditLog
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserOut, Token
@@ -11,13 +14,15 @@ from app.schemas.auth import UserCreate, UserOut, Token
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+# Login and register are async: bcrypt runs in the password hasher's process pool and
+# the route just awaits it, so a burst of logins holds no request threads.
 @router.post("/register", response_model=UserOut)
-def register(
+async def register(
     payload: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _user=Depends(require_role("admin", "management")),
 ):
-    existing = db.query(User).filter(User.email == payload.email).first()
+    existing = await db.scalar(select(User).where(User.email == payload.email))
     # if the email already exists
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -26,11 +31,11 @@ def register(
         email=payload.email,
         full_name=payload.full_name,
         role=payload.role,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await password_hasher.hash(payload.password),
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     db.add(
         AuditLog(
@@ -41,7 +46,7 @@ def register(
             diff_json=AuditLog.dumps({"email": user.email, "role": user.role}),
         )
     )
-    db.commit()
+    await db.commit()
     return user
 
 
@@ -50,7 +55,9 @@ def list_users(
     db: Session = Depends(get_db),
     _user=Depends(require_role("admin", "management")),
 ):
-    return db.query(User).order_by(User.created_at.desc()).all()
+    fields = list(UserOut.model_fields)
+    rows = db.execute(select(*(getattr(User, f) for f in fields)).order_by(User.created_at.desc()))
+    return fast_json(rows_as_dicts(fields, rows))
 
 # You won’t type form fields manually; frontend handles it for you.
 # But this endpoint is still called during login.
@@ -58,9 +65,12 @@ def list_users(
 # OAuth2PasswordRequestForm: This is a standard FastAPI tool that 
 # extracts the username (email) and password from the login request.
 @router.post("/token", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not verified:
         if user:
             db.add(
                 AuditLog(
@@ -71,9 +81,13 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
                     diff_json=AuditLog.dumps({"email": user.email}),
                 )
             )
-            db.commit()
+            await db.commit()
         raise HTTPException(status_code=401, detail="Incorrect email or password")
 
+    # Stored with a different bcrypt cost than BCRYPT_ROUNDS: keep the re-hash.
+    if new_hash:
+        user.hashed_password = new_hash
+
     db.add(
         AuditLog(
             actor_user_id=user.id,
@@ -83,7 +97,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             diff_json=AuditLog.dumps({"email": user.email}),
         )
     )
-    db.commit()
+    await db.commit()
 
     token = create_access_token(subject=user.email, role=user.role)
     return Token(access_token=token)
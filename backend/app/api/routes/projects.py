@@ -1,26 +1,45 @@
 from datetime import date
-from decimal import Decimal
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user, require_role
+from app.api.conditional import is_fresh, not_modified, validator_headers, weak_etag
+from app.api.deps import get_async_db, get_db, get_current_user, require_role
+from app.api.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
+from app.api.fast_json import fast_json, rows_as_dicts
+from app.api.pagination import decode_cursor, encode_cursor, keyset_param
+from app.core.config import settings
+from app.db.data_version import portfolio_version, project_watermark
+from app.db.search import apply_search
+from app.db.session import SessionLocal
 from app.models.project import Project
 from app.models.audit import AuditLog, ProjectFundingEvent, ProjectUpdate
 from app.schemas.project import (
+    ProjectBatchItemResult,
+    ProjectBatchResult,
+    ProjectBatchUpdateItem,
     ProjectCreate,
     ProjectFundingEventCreate,
     ProjectFundingEventOut,
+    ProjectListItem,
     ProjectOut,
     ProjectUpdate as ProjectUpdateSchema,
     ProjectEndRequest,
     ProjectUpdateCreate,
     ProjectUpdateOut,
 )
+from app.services.funding import record_funding
+from app.services.project_batch import BatchMode, create_projects, update_projects
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
+# In ProjectListItem order, so rows encoded straight from columns match the model's output.
+PROJECT_FIELDS = tuple(ProjectListItem.model_fields)
+
 # write a entry into the AuditLog table every time a project is touched.
 def _log(db: Session, actor_user_id: int, action: str, entity_type: str, entity_id: int, diff: dict | None = None):
     db.add(
@@ -33,25 +52,44 @@ def _log(db: Session, actor_user_id: int, action: str, entity_type: str, entity_
         )
     )
 
-# response_model=list[ProjectOut]: Tells FastAPI to format the returned 
-# list of database objects using the ProjectOut schema.
-@router.get("", response_model=list[ProjectOut])
-def list_projects(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
-    q: str | None = Query(default=None, description="Search in title/domain/institution"),
+
+# (title, institution) is the natural key the AMGrant ingest upserts on, so it must stay unique.
+DUPLICATE_KEY_DETAIL = "A project with this title and institution already exists"
+
+
+def _ensure_unique_key(db: Session, title: str, institution: str, exclude_id: int | None = None):
+    query = db.query(Project.id).filter(Project.title == title, Project.institution == institution)
+    if exclude_id is not None:
+        query = query.filter(Project.id != exclude_id)
+    if query.first():
+        raise HTTPException(status_code=400, detail=DUPLICATE_KEY_DETAIL)
+
+
+# The pre-check above races with concurrent requests for the same key; the unique index
+# settles it, and the loser gets the same 400 instead of a 500.
+def _write_with_unique_key(db: Session, write) -> None:
+    try:
+        write()
+    except IntegrityError as exc:
+        db.rollback()
+        message = str(exc.orig)
+        if "uq_projects_title_institution" in message or "projects.title, projects.institution" in message:
+            raise HTTPException(status_code=400, detail=DUPLICATE_KEY_DETAIL) from exc
+        raise
+
+# Shared by every project listing: search/filter params plus researcher scoping.
+# Returns the filtered query and, when searching, a relevance rank (higher is better).
+def _filter_projects(
+    db: Session,
+    query,
+    user,
+    q: str | None = None,
     institution: str | None = None,
     maturity_stage: str | None = None,
 ):
-    query = db.query(Project)
-
-    if q:
-        like = f"%{q.strip()}%"
-        query = query.filter(
-            (Project.title.ilike(like))
-            | (Project.domain.ilike(like))
-            | (Project.institution.ilike(like))
-        )
+    rank = None
+    if q and q.strip():
+        query, rank = apply_search(query, db.get_bind().dialect.name, q)
 
     if institution:
         query = query.filter(Project.institution == institution)
@@ -62,7 +100,89 @@ def list_projects(
     if user.role == "researcher":
         query = query.filter(Project.owner_id == user.id)
 
-    return query.order_by(Project.updated_at.desc()).all()
+    return query, rank
+
+
+def _parse_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return list(PROJECT_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(PROJECT_FIELDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    # id and updated_at form the page cursor, so they are always returned.
+    wanted = {"id", *requested, "updated_at"}
+    return [f for f in PROJECT_FIELDS if f in wanted]
+
+
+def _list_projects_page(
+    db: Session,
+    response: Response,
+    user,
+    columns: list[str],
+    q: str | None,
+    institution: str | None,
+    maturity_stage: str | None,
+    limit: int,
+    cursor: str | None,
+    include_total: bool,
+) -> list[dict]:
+    query, rank = _filter_projects(db, db.query(Project), user, q, institution, maturity_stage)
+
+    if include_total:
+        response.headers["X-Total-Count"] = str(query.order_by(None).count())
+
+    # Relevance-ranked when searching, otherwise most recently updated first.
+    sort_key = rank.label("rank") if rank is not None else Project.updated_at
+    query = query.with_entities(*(getattr(Project, c) for c in columns), sort_key)
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, 2)
+        dialect = db.get_bind().dialect.name
+        query = query.filter(tuple_(sort_key, Project.id) < tuple_(keyset_param(dialect, last_key), last_id))
+
+    rows = query.order_by(sort_key.desc(), Project.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1][-1], rows[-1].id)
+
+    return rows_as_dicts(columns, rows)
+
+
+# Rows come back newest-first (best match first when `q` is given), `limit` at a time. The next
+# page is requested by passing the X-Next-Cursor response header back as `cursor`; the body stays a plain list.
+# response_model_exclude_unset drops the columns not asked for via `fields`.
+# The query code is shared with sync callers, so it runs through run_sync on the async session.
+# Rows are plain column dicts encoded by orjson (fast_json), not validated ProjectListItem models.
+# The ETag covers the caller's visible projects (count, max(updated_at), write counter) and the query
+# string, so an unchanged page answers 304 after two index lookups instead of the page query.
+# No Last-Modified here: deleting a project doesn't move max(updated_at).
+@router.get("", response_model=list[ProjectListItem], response_model_exclude_unset=True)
+async def list_projects(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+    q: str | None = Query(default=None, description="Full-text search in title/domain/institution/description"),
+    institution: str | None = None,
+    maturity_stage: str | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor header of the previous page"),
+    fields: str | None = Query(default=None, description="Comma-separated columns to return, e.g. id,title,status"),
+    include_total: bool = Query(default=False, description="Also count all matches into X-Total-Count"),
+):
+    columns = _parse_fields(fields)
+
+    owner_id = user.id if user.role == "researcher" else None
+    count, last_updated = (await db.execute(project_watermark(owner_id))).one()
+    etag = weak_etag("projects", owner_id, count, last_updated, portfolio_version.current, request.url.query)
+    if is_fresh(request, etag):
+        return not_modified(etag)
+    response.headers.update(validator_headers(etag))
+
+    rows = await db.run_sync(
+        _list_projects_page, response, user, columns, q, institution, maturity_stage, limit, cursor, include_total
+    )
+    return fast_json(rows, response)
 
 # payload: ProjectCreate: Expects a JSON body matching the ProjectCreate schema.
 @router.post("", response_model=ProjectOut)
@@ -71,11 +191,12 @@ def create_project(payload: ProjectCreate, db: Session = Depends(get_db), user=D
     data = payload.model_dump()
     data.pop("start_date", None)
     data.pop("end_date", None)
+    _ensure_unique_key(db, data["title"], data["institution"])
 
     # Converts the Pydantic payload into a dictionary, unpacks it (**), and injects the logged-in user's ID as the owner_id.
     project = Project(**data, owner_id=user.id)
     db.add(project)
-    db.flush()
+    _write_with_unique_key(db, db.flush)
 
     if project.created_at is not None:
         project.start_date = project.created_at.date()
@@ -90,15 +211,103 @@ def create_project(payload: ProjectCreate, db: Session = Depends(get_db), user=D
     db.commit()
     return project
 
+
+def _export_project_batches(user, columns: list[str], q, institution, maturity_stage):
+    # Opens its own session: the request's dependencies are closed before a streamed body is sent.
+    with SessionLocal() as db:
+        query, _rank = _filter_projects(db, db.query(Project), user, q, institution, maturity_stage)
+        query = query.with_entities(*(getattr(Project, c) for c in columns)).order_by(Project.id)
+        result = db.execute(query.statement, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        yield from result.partitions()
+
+
+# Every matching project as one download: same filters and researcher scoping as GET /projects,
+# read through a server-side cursor and streamed batch by batch, so memory stays flat and
+# the first bytes go out before the query has finished. Rows are in id order.
+@router.get("/export")
+def export_projects(
+    user=Depends(get_current_user),
+    q: str | None = Query(default=None, description="Full-text search in title/domain/institution/description"),
+    institution: str | None = None,
+    maturity_stage: str | None = None,
+    fields: str | None = Query(default=None, description="Comma-separated columns to export, e.g. id,title,status"),
+    format: ExportFormat = "csv",
+):
+    columns = _parse_fields(fields)
+    batches = _export_project_batches(user, columns, q, institution, maturity_stage)
+    return export_response(columns, batches, format, "projects")
+
+
+def _batch_response(response: Response, mode: str, results) -> ProjectBatchResult:
+    failed = sum(1 for r in results if r.status == "failed")
+    applied = sum(1 for r in results if r.status in ("created", "updated"))
+    if mode == "atomic" and failed:
+        response.status_code = 400
+    return ProjectBatchResult(
+        mode=mode,
+        applied=applied,
+        failed=failed,
+        results=[ProjectBatchItemResult(**vars(r)) for r in results],
+    )
+
+
+def _check_batch_size(items: list) -> None:
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > settings.PROJECT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400, detail=f"Batch is limited to {settings.PROJECT_BATCH_MAX_ITEMS} items per request"
+        )
+
+
+# Batch endpoints for integration scripts: the body is a JSON array, every item is validated in one
+# pass, and the valid ones are written in a single transaction with bulk inserts/updates and audit rows.
+# mode=atomic (default) applies nothing if any item fails (HTTP 400); mode=best_effort applies the rest.
+# Declared before /{project_id} so "batch" is not parsed as a project id.
+@router.post("/batch", response_model=ProjectBatchResult)
+def create_projects_batch(
+    payload: list[ProjectCreate],
+    response: Response,
+    mode: BatchMode = "atomic",
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    _check_batch_size(payload)
+    return _batch_response(response, mode, create_projects(db, payload, user=user, mode=mode))
+
+
+@router.patch("/batch", response_model=ProjectBatchResult)
+def update_projects_batch(
+    payload: list[ProjectBatchUpdateItem],
+    response: Response,
+    mode: BatchMode = "atomic",
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    _check_batch_size(payload)
+    return _batch_response(response, mode, update_projects(db, payload, user=user, mode=mode))
+
 # Fetches a single project by the ID in the URL.
 @router.get("/{project_id}", response_model=ProjectOut)
-def get_project(project_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+async def get_project(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(get_current_user),
+):
+    # Ownership and updated_at first: enough to answer 403/404 or 304 without loading the row.
+    head = (await db.execute(select(Project.owner_id, Project.updated_at).where(Project.id == project_id))).first()
+    if not head:
         raise HTTPException(status_code=404, detail="Project not found")
-    if user.role == "researcher" and project.owner_id != user.id:
+    if user.role == "researcher" and head.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
-    return project
+
+    etag = weak_etag("project", project_id, head.updated_at, portfolio_version.current)
+    if is_fresh(request, etag, head.updated_at):
+        return not_modified(etag, head.updated_at)
+    response.headers.update(validator_headers(etag, head.updated_at))
+    return await db.get(Project, project_id)
 
 # PATCH means a partial update (as opposed to PUT, which replaces the whole object).
 @router.patch("/{project_id}", response_model=ProjectOut)
@@ -123,6 +332,14 @@ def update_project(
     data.pop("start_date", None)
     data.pop("end_date", None)
 
+    if "title" in data or "institution" in data:
+        _ensure_unique_key(
+            db,
+            data.get("title") or project.title,
+            data.get("institution") or project.institution,
+            exclude_id=project.id,
+        )
+
     new_status = data.get("status")
     completed_in_this_update = False
     if new_status == "Completed":
@@ -148,7 +365,7 @@ def update_project(
         )
 
     db.add(project)
-    db.commit()
+    _write_with_unique_key(db, db.commit)
     db.refresh(project)
 
     _log(db, user.id, "UPDATE", "Project", project.id, diff=data)
@@ -243,23 +460,24 @@ def add_update(
 
 
 @router.get("/{project_id}/updates", response_model=list[ProjectUpdateOut])
-def list_updates(
+async def list_updates(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if user.role == "researcher" and project.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    return (
-        db.query(ProjectUpdate)
-        .filter(ProjectUpdate.project_id == project_id)
+    fields = list(ProjectUpdateOut.model_fields)
+    rows = await db.execute(
+        select(*(getattr(ProjectUpdate, f) for f in fields))
+        .where(ProjectUpdate.project_id == project_id)
         .order_by(ProjectUpdate.created_at.desc())
-        .all()
     )
+    return fast_json(rows_as_dicts(fields, rows))
 
 
 @router.post("/{project_id}/funding", response_model=ProjectFundingEventOut)
@@ -269,7 +487,9 @@ def add_project_funding(
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.execute(
+        select(Project.id, Project.owner_id, Project.domain).where(Project.id == project_id)
+    ).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if user.role == "researcher" and project.owner_id != user.id:
@@ -278,17 +498,8 @@ def add_project_funding(
     amount = payload.amount_sgd
     note = payload.note.strip() if payload.note and payload.note.strip() else None
 
-    current_total = Decimal(project.funding_amount_sgd or 0)
-    project.funding_amount_sgd = current_total + amount
-
-    event = ProjectFundingEvent(
-        project_id=project_id,
-        author_user_id=user.id,
-        amount_sgd=amount,
-        note=note,
-    )
-    db.add(event)
-    db.add(project)
+    # The total is incremented in SQL, so concurrent funding posts can't lose each other's amounts.
+    event, total = record_funding(db, project.id, project.domain, amount, author_user_id=user.id, note=note)
 
     _log(
         db,
@@ -298,7 +509,7 @@ def add_project_funding(
         project.id,
         diff={
             "funding_added_sgd": str(amount),
-            "funding_total_sgd": str(project.funding_amount_sgd),
+            "funding_total_sgd": str(total),
             "note": note,
         },
     )
@@ -309,20 +520,20 @@ def add_project_funding(
 
 
 @router.get("/{project_id}/funding", response_model=list[ProjectFundingEventOut])
-def list_project_funding_events(
+async def list_project_funding_events(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(get_current_user),
 ):
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if user.role == "researcher" and project.owner_id != user.id:
         raise HTTPException(status_code=403, detail="Not allowed")
 
-    return (
-        db.query(ProjectFundingEvent)
-        .filter(ProjectFundingEvent.project_id == project_id)
+    events = await db.scalars(
+        select(ProjectFundingEvent)
+        .where(ProjectFundingEvent.project_id == project_id)
         .order_by(ProjectFundingEvent.created_at.desc())
-        .all()
     )
+    return events.all()
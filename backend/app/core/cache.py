@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe LRU cache whose entries also expire ``ttl_seconds`` after being set.
+
+    Route handlers run in FastAPI's threadpool, so every operation takes a lock.
+    With ``max_bytes`` and a ``sizeof`` function, least recently used entries are
+    also evicted once the estimated total size goes over the cap.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        *,
+        max_bytes: int | None = None,
+        sizeof: Callable[[K, V], int] | None = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda _key, _value: 0)
+        self._data: OrderedDict[K, tuple[float, V, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value, size = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.bytes -= size
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V) -> None:
+        size = self._sizeof(key, value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value, size)
+            self.bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is not None:
+                self.bytes -= item[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VersionedCache(Generic[K, V]):
+    """Keeps one value per key, valid only while the caller's data version is unchanged.
+
+    Entries computed at an older version are treated as misses and overwritten on
+    the next ``set``, so there is nothing to invalidate explicitly.
+    """
+
+    def __init__(self) -> None:
+        self._data: dict[K, tuple[Hashable, V]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K, version: Hashable) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] != version:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return item[1]
+
+    def peek(self, key: K) -> V | None:
+        """Whatever is stored for ``key``, even if it was computed at an older version."""
+        with self._lock:
+            item = self._data.get(key)
+            return item[1] if item is not None else None
+
+    def set(self, key: K, version: Hashable, value: V) -> None:
+        with self._lock:
+            self._data[key] = (version, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
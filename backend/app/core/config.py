@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     # App
     APP_NAME: str = "AGM Portal MVP"
     ENV: str = "dev"  # dev|prod
+    DEBUG: bool = False  # adds a Server-Timing SQL summary to responses (see SQL profiler below)
     API_V1_PREFIX: str = "/api/v1" # Puts /api/v1 in front of every URL so you can version your API later.
 
     # Security
@@ -19,16 +20,93 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60*24  # 1 day
     ALGORITHM: str = "HS256"
 
+    # bcrypt cost (2^rounds iterations); existing hashes are upgraded on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+    # Hashing runs in its own process pool; past MAX_PENDING queued hashes, login/register answer 503.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Users resolved from a token subject are cached so hot endpoints skip the users lookup.
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 1024
+
     # CORS, Guest List of allowed websites in production.
     BACKEND_CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
 
+    # JSON responses of at least MIN_BYTES are compressed: brotli when the client accepts it
+    # (and the brotli package is installed), otherwise gzip. Streamed bodies are never buffered.
+    RESPONSE_COMPRESSION: bool = True
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Prometheus metrics on /metrics (request latency, DB queries per request, pool, LLM, ingest).
+    METRICS_ENABLED: bool = True
+
+    # SQL profiler: statement counts, SQL time and repeated statements per route, reported on /admin/stats.
+    # Profiles every request when ENABLED; otherwise only requests sending an X-SQL-Profile header
+    # (ignored in prod unless DEBUG).
+    SQL_PROFILER_ENABLED: bool = False
+    SQL_SLOW_QUERY_MS: float = 200.0  # slower statements are logged with their route
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times in one request is logged as N+1
+
     # Database, The specific "map" to find your Postgres database container.
     DATABASE_URL: str = "postgresql+psycopg2://postgres:postgres@db:5432/agm"
+    ASYNC_DATABASE_URL: str | None = None  # async driver URL; derived from DATABASE_URL when unset
+
+    # Connection pools: the sync and async engines each keep their own, in every worker process,
+    # so a worker opens up to 2 * (POOL_SIZE + MAX_OVERFLOW) connections.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # wait for a free connection before failing the request
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # replace older connections (-1: never)
+    DB_POOL_PRE_PING: bool = False  # test every connection on checkout (one extra round-trip each)
+    DB_NULL_POOL: bool = False  # no app-side pool: connect per checkout, for PgBouncer in front of Postgres
+    DB_STATEMENT_TIMEOUT_MS: int = 0  # Postgres statement_timeout per connection (0: none)
+
+    # AMGrant CSV ingest: rows parsed, looked up and upserted per round-trip.
+    INGEST_BATCH_SIZE: int = 1000
+
+    # POST/PATCH /projects/batch: most items accepted per request.
+    PROJECT_BATCH_MAX_ITEMS: int = 5000
+
+    # API_CALL audit rows are queued in-process and written by a background task.
+    AUDIT_QUEUE_MAXSIZE: int = 10000
+    AUDIT_FLUSH_BATCH_SIZE: int = 500  # flush when this many entries are waiting...
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0  # ...or when the oldest has waited this long
+    AUDIT_OVERFLOW_POLICY: str = "block"  # block|drop|spill when the queue is full
+    AUDIT_SPILL_PATH: str = "audit_spill.jsonl"  # replayed into the DB on next startup
+
+    # Audit storage: monthly partitions on Postgres, created this many months ahead.
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
+    # Opt-in retention: months that ended more than RETENTION_DAYS ago are archived to gzipped
+    # JSONL in ARCHIVE_DIR and removed from the database (0 keeps everything). ARCHIVE_DIR must be
+    # an existing, writable absolute path on durable storage, or startup fails.
+    AUDIT_RETENTION_DAYS: int = 0
+    AUDIT_ARCHIVE_DIR: str | None = None
+    AUDIT_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0  # 0 disables the background job
 
     # Optional LLM integration
     # 1 = OpenAI API, 2 = Ollama, 3 = local OpenAI-compatible server
     LLM_MODE: int = 3
-    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_TIMEOUT_SECONDS: float = 30.0  # read/write/pool timeout per provider call
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    # Provider HTTP clients are created once and reused for the app's lifetime.
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    LLM_HTTP2: bool = True  # negotiated over TLS only (OpenAI); local servers stay on HTTP/1.1
+
+    # Assistant context: only the projects most relevant to the conversation are sent,
+    # capped at this many rows and this many (estimated) prompt tokens.
+    ASSISTANT_CONTEXT_TOP_K: int = 20
+    ASSISTANT_CONTEXT_TOKEN_BUDGET: int = 2000
+
+    # Assistant replies to opening questions are cached per scope, model and data version.
+    ASSISTANT_CACHE_TTL_SECONDS: float = 600.0
+    ASSISTANT_CACHE_MAX_ENTRIES: int = 512
+    ASSISTANT_CACHE_MAX_BYTES: int = 8 * 1024 * 1024
 
     # Mode 1: OpenAI, insert your own API key here("sk-....")
     OPENAI_API_KEY: str | None = None
@@ -0,0 +1,234 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+"""
+SQL profiler for finding chatty routes, N+1 patterns and slow statements.
+
+A request is profiled when ``SQL_PROFILER_ENABLED`` is set, or when it carries
+an ``X-SQL-Profile`` header (honored outside prod, or in prod with ``DEBUG``).
+Cursor events on both engines then record every statement the request runs
+under a fingerprint: whitespace collapsed, literals and ``IN (?, ?, ...)``
+lists folded, so the same query with different ids counts as one.
+
+Per request: statements slower than ``SQL_SLOW_QUERY_MS`` are logged as they
+finish, with the route, method and path; a fingerprint executed at least
+``SQL_N_PLUS_ONE_THRESHOLD`` times is logged as an N+1 suspect. Per route
+totals (requests, statements, SQL time, slow statements, repeated
+fingerprints) are recorded once the last body chunk is sent, so streamed
+exports and assistant replies include the statements issued while streaming,
+and are reported on ``/admin/stats``. With ``DEBUG`` or the request header, the
+response also carries
+``Server-Timing: sql;dur=<ms>;desc="<n> statements, <k> repeated"``, which
+browser dev tools show next to the request. Headers are sent before the body,
+so for streamed responses the header only covers statements run before the
+response started; the per-route totals and logs have the full count.
+
+Requests that aren't profiled cost one context-variable lookup per statement.
+"""
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-sql-profile"
+MAX_FINGERPRINTS_PER_ROUTE = 100  # repeated fingerprints kept per route for /admin/stats
+STATEMENT_LOG_CHARS = 500
+
+_SPACES = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PARAM_LISTS = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalize ``statement`` so executions differing only in values compare equal."""
+    text = _SPACES.sub(" ", statement).strip()
+    text = _LITERALS.sub("?", text)
+    return _PARAM_LISTS.sub("(...)", text)
+
+
+@dataclass
+class RequestProfile:
+    scope: Scope
+    statements: int = 0
+    seconds: float = 0.0
+    slow: int = 0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    @property
+    def route(self) -> str:
+        # FastAPI puts the matched route on the shared scope; until then only the path is known.
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def repeated(self) -> list[tuple[str, int]]:
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+        return [(fp, count) for fp, count in self.fingerprints.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        return (
+            f'sql;dur={self.seconds * 1000:.1f};'
+            f'desc="{self.statements} statements, {len(self.repeated())} repeated"'
+        )
+
+
+@dataclass
+class RouteProfile:
+    requests: int = 0
+    statements: int = 0
+    seconds: float = 0.0
+    max_statements: int = 0
+    slow: int = 0
+    n_plus_one: int = 0  # requests with at least one repeated fingerprint
+    repeated: Counter = field(default_factory=Counter)  # fingerprint -> requests that repeated it
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "statements_avg": round(self.statements / self.requests, 2) if self.requests else None,
+            "statements_max": self.max_statements,
+            "sql_ms_avg": round(self.seconds * 1000 / self.requests, 2) if self.requests else None,
+            "slow_statements": self.slow,
+            "n_plus_one_requests": self.n_plus_one,
+            "top_repeated": [
+                {"fingerprint": fp[:STATEMENT_LOG_CHARS], "requests": count}
+                for fp, count in self.repeated.most_common(3)
+            ],
+        }
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("sql_profile", default=None)
+
+
+class SQLProfiler:
+    """Per-route SQL totals for profiled requests, reported on ``/admin/stats``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, RouteProfile] = {}
+
+    def finish(self, profile: RequestProfile) -> None:
+        route = profile.route
+        repeated = profile.repeated()
+        for fp, count in repeated:
+            logger.warning(
+                "Possible N+1 in %s %s (%s): %d executions of %s",
+                profile.scope["method"], profile.scope["path"], route, count, fp[:STATEMENT_LOG_CHARS],
+            )
+        with self._lock:
+            totals = self._routes.setdefault(route, RouteProfile())
+            totals.requests += 1
+            totals.statements += profile.statements
+            totals.seconds += profile.seconds
+            totals.max_statements = max(totals.max_statements, profile.statements)
+            totals.slow += profile.slow
+            if repeated:
+                totals.n_plus_one += 1
+                for fp, _count in repeated:
+                    if fp in totals.repeated or len(totals.repeated) < MAX_FINGERPRINTS_PER_ROUTE:
+                        totals.repeated[fp] += 1
+
+    def stats(self, limit: int = 20) -> dict[str, Any]:
+        with self._lock:
+            routes = sorted(self._routes.items(), key=lambda item: item[1].seconds, reverse=True)[:limit]
+            return {
+                "enabled": settings.SQL_PROFILER_ENABLED,
+                "slow_query_ms": settings.SQL_SLOW_QUERY_MS,
+                "routes": {route: totals.as_dict() for route, totals in routes},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+sql_profiler = SQLProfiler()
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("sql_profile_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, executemany) -> None:
+    profile = _current.get()
+    if profile is None:
+        return
+    starts = conn.info.get("sql_profile_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    profile.statements += 1
+    profile.seconds += elapsed
+    if not executemany:  # one batched insert is not a loop of single-row ones
+        profile.fingerprints[fingerprint(statement)] += 1
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        profile.slow += 1
+        logger.warning(
+            "Slow SQL (%.1f ms) in %s %s (%s): %s",
+            elapsed * 1000, profile.scope["method"], profile.scope["path"], profile.route,
+            _SPACES.sub(" ", statement)[:STATEMENT_LOG_CHARS],
+        )
+
+
+def profile_engine(engine: Engine) -> None:
+    """Record statements run by ``engine`` (a sync Engine) for profiled requests."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = (settings.ENV != "prod" or settings.DEBUG) and any(
+            name == PROFILE_HEADER for name, _value in scope["headers"]
+        )
+        if not (requested or settings.SQL_PROFILER_ENABLED):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope)
+        timing = settings.DEBUG or requested
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            if not finished:
+                finished = True
+                sql_profiler.finish(profile)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and timing:
+                # Headers go out before a streamed body, so this only counts statements run so far.
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", profile.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Recorded once the whole body is out, including statements issued while it streamed.
+                finish()
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            finish()  # no final body message: the app failed or the client went away
@@ -1,12 +1,16 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost still verify; verify_and_update re-hashes them at BCRYPT_ROUNDS.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 def hash_password(password: str) -> str:
@@ -17,6 +21,86 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are already queued; the caller should retry later."""
+
+
+class PasswordHasher:
+    """bcrypt in a small dedicated process pool.
+
+    bcrypt is deliberately slow, so running it in request threads lets a burst of
+    logins occupy every worker thread and CPU core. Here at most ``workers`` hashes
+    run at once, and once ``max_pending`` are queued or running new requests are
+    refused with ``PasswordHasherBusy`` (a 503) instead of piling up.
+    Counters are only touched on the event loop, so they need no lock.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the server process has threads (threadpool, DB pools) a fork would copy mid-state.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def start(self) -> None:
+        # Start the workers now so the first logins don't pay for process start-up.
+        executor = self.executor()
+        for future in [executor.submit(hash_password, "warm-up") for _ in range(self.workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor(), fn, *args)
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def hash_many(self, passwords: list[str]) -> list[str]:
+        """Blocking, for start-up seeding: hashes in parallel across the pool."""
+        return list(self.executor().map(hash_password, passwords))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(workers=settings.PASSWORD_HASH_WORKERS, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
+
+
 def create_access_token(subject: str, role: str, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -0,0 +1,158 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+"""
+Monthly range partitions for ``audit_logs`` on Postgres.
+
+The parent table is ``PARTITION BY RANGE (created_at)`` with one child per
+calendar month (UTC) named ``audit_logs_pYYYYMM``, plus ``audit_logs_default``
+for rows outside every range (e.g. a spilled audit batch replayed long after
+the fact). Inserts only touch the current month's heap and indexes, autovacuum
+works per partition, and retention drops whole partitions instead of deleting
+rows, so write and vacuum costs don't grow with history.
+
+Postgres requires the partition key in the primary key, so the table's key is
+``(id, created_at)``; ``id`` still comes from the same sequence and stays unique
+in practice, and the ORM keeps treating it as the identity.
+
+``ensure_partitioned`` converts an existing plain table once (copying its rows)
+and is a no-op afterwards; ``ensure_partitions`` creates the months ahead.
+Other dialects keep a single table.
+"""
+
+logger = logging.getLogger(__name__)
+
+PARENT = "audit_logs"
+DEFAULT_PARTITION = f"{PARENT}_default"
+_PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(moment: datetime | date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    months = month.year * 12 + month.month - 1 + count
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month.year:04d}{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    kind = conn.execute(
+        text("SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(:name)"), {"name": PARENT}
+    ).scalar()
+    return kind == "p"
+
+
+def list_partitions(conn: Connection) -> dict[date, str]:
+    """Monthly partitions currently attached to audit_logs, keyed by month."""
+    rows = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": PARENT},
+    ).scalars()
+    partitions = {}
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def _create_partition(conn: Connection, month: date) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+    )
+
+
+def ensure_partitions(engine: Engine, first: date, months_ahead: int) -> int:
+    """Create monthly partitions from ``first`` through ``months_ahead`` months past now."""
+    last = add_months(month_start(datetime.now(timezone.utc)), months_ahead)
+    created = 0
+    with engine.connect() as conn:
+        existing = set(list_partitions(conn))
+    month = month_start(first)
+    while month <= last:
+        if month not in existing:
+            try:
+                with engine.begin() as conn:
+                    _create_partition(conn, month)
+                created += 1
+            except DBAPIError:
+                # The default partition already holds rows for this month; they stay
+                # there and are archived by the retention job with everything else.
+                logger.warning("Could not create audit partition %s", partition_name(month), exc_info=True)
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitioned(engine: Engine, months_ahead: int) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            first = None
+        else:
+            first = _convert_to_partitioned(conn, months_ahead)
+    if first is None:
+        first = month_start(datetime.now(timezone.utc))
+    ensure_partitions(engine, first, months_ahead)
+
+
+def _convert_to_partitioned(conn: Connection, months_ahead: int) -> date:
+    # One transaction: move the plain table aside, create the partitioned parent with the
+    # same columns and defaults (including the id sequence), copy the rows, drop the old table.
+    legacy = f"{PARENT}_unpartitioned"
+    conn.execute(text(f"LOCK TABLE {PARENT} IN ACCESS EXCLUSIVE MODE"))
+    oldest = conn.execute(text(f"SELECT min(created_at) FROM {PARENT}")).scalar()
+    first = month_start(oldest) if oldest is not None else month_start(datetime.now(timezone.utc))
+
+    conn.execute(text(f"ALTER TABLE {PARENT} RENAME TO {legacy}"))
+    conn.execute(text(f"ALTER TABLE {legacy} RENAME CONSTRAINT {PARENT}_pkey TO {legacy}_pkey"))
+    # The sequence belongs to the old id column and would be dropped with it.
+    conn.execute(text(f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY NONE"))
+
+    conn.execute(
+        text(f"CREATE TABLE {PARENT} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    )
+    conn.execute(text(f"ALTER TABLE {PARENT} ALTER COLUMN created_at SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {PARENT} ADD CONSTRAINT {PARENT}_pkey PRIMARY KEY (id, created_at)"))
+    conn.execute(
+        text(
+            f"ALTER TABLE {PARENT} ADD CONSTRAINT {PARENT}_actor_user_id_fkey "
+            "FOREIGN KEY (actor_user_id) REFERENCES users (id)"
+        )
+    )
+    conn.execute(text(f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY {PARENT}.id"))
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+    month, last = first, add_months(month_start(datetime.now(timezone.utc)), months_ahead)
+    while month <= last:
+        _create_partition(conn, month)
+        month = add_months(month, 1)
+
+    copied = conn.execute(
+        text(
+            f"INSERT INTO {PARENT} (id, actor_user_id, action, entity_type, entity_id, diff_json, created_at) "
+            f"SELECT id, actor_user_id, action, entity_type, entity_id, diff_json, coalesce(created_at, now()) "
+            f"FROM {legacy}"
+        )
+    ).rowcount
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    logger.info("Converted %s to monthly partitions (%d rows copied)", PARENT, copied)
+    return first
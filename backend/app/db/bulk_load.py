@@ -0,0 +1,162 @@
+"""
+Bulk loading for seeding staging and benchmark databases.
+
+Rows arrive in chunks: each chunk maps a table to a list of tuples in that
+table's column order, and tables are written in the order ``columns`` lists
+them (parents first), so every chunk is self-consistent for foreign keys.
+
+Postgres (psycopg2): one ``COPY ... FROM STDIN (FORMAT csv)`` per table per
+chunk, with ``None`` sent as NULL. Elsewhere: ``executemany`` of a positional
+INSERT straight on the DB-API cursor, after running each value through the
+column type's bind processor so stored values look exactly like ORM writes
+(e.g. SQLite's datetime text format). SQLite also runs the load with
+``synchronous=OFF``; each chunk is committed, so a crash loses at most the
+chunk in flight.
+
+Secondary indexes of the loaded tables and the project search index are
+dropped before the first chunk and built once after the last one, which is
+far cheaper than maintaining them row by row. Primary keys and unique
+constraints stay in place.
+"""
+import csv
+import io
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping, Sequence
+
+from sqlalchemy import Table, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.search import drop_search_index, ensure_search_index
+
+COPY_CHUNK_BYTES = 1 << 22  # flush the CSV buffer to COPY every ~4 MB
+
+
+@dataclass
+class LoadStats:
+    rows: dict[str, int] = field(default_factory=dict)
+    load_seconds: float = 0.0
+    index_seconds: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        seconds = self.load_seconds + self.index_seconds
+        return self.total_rows / seconds if seconds else 0.0
+
+
+def _copy(conn: Connection, table: Table, columns: Sequence[str], rows: Sequence[tuple]) -> None:
+    cursor = conn.connection.dbapi_connection.cursor()
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    try:
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() >= COPY_CHUNK_BYTES:
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+    finally:
+        cursor.close()
+
+
+def _insert_many(conn: Connection, table: Table, columns: Sequence[str], rows: Sequence[tuple]) -> None:
+    dialect = conn.dialect
+    processors = [table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in columns]
+    if any(processors):
+        # Column-wise: one list comprehension per converted column, then zip the rows back together.
+        values = list(zip(*rows))
+        for i, process in enumerate(processors):
+            if process is not None:
+                values[i] = [None if value is None else process(value) for value in values[i]]
+        rows = list(zip(*values))
+
+    placeholder = "?" if dialect.paramstyle == "qmark" else "%s"
+    statement = (
+        f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join([placeholder] * len(columns))})"
+    )
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.executemany(statement, rows)
+    finally:
+        cursor.close()
+
+
+def _uses_copy(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+
+def _reset_sequences(conn: Connection, tables: Iterable[Table]) -> None:
+    # Rows loaded with explicit ids leave Postgres sequences behind; move them past the data.
+    for table in tables:
+        if "id" in table.c and table.c.id.primary_key and table.c.id.autoincrement in (True, "auto"):
+            conn.execute(
+                text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), COALESCE(MAX(id), 0) + 1, false) "
+                    f"FROM {table.name}"
+                )
+            )
+
+
+def bulk_load(
+    engine: Engine,
+    columns: Mapping[Table, Sequence[str]],
+    chunks: Iterable[Mapping[Table, Sequence[tuple]]],
+    *,
+    defer_indexes: bool = True,
+) -> LoadStats:
+    """Write every chunk into ``engine``; see the module docstring for how."""
+    tables = list(columns)
+    stats = LoadStats(rows={table.name: 0 for table in tables})
+    indexes = [index for table in tables for index in table.indexes] if defer_indexes else []
+    search_index = defer_indexes and any(table.name == "projects" for table in tables)
+    write = _copy if _uses_copy(engine) else _insert_many
+
+    for index in indexes:
+        index.drop(bind=engine, checkfirst=True)
+    if search_index:
+        drop_search_index(engine)
+
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            synchronous: Any = None
+            if engine.dialect.name == "sqlite":
+                synchronous = conn.exec_driver_sql("PRAGMA synchronous").scalar()
+                conn.exec_driver_sql("PRAGMA synchronous=OFF")
+                conn.commit()
+            try:
+                for chunk in chunks:
+                    with conn.begin():
+                        for table in tables:
+                            rows = chunk.get(table)
+                            if rows:
+                                write(conn, table, columns[table], rows)
+                                stats.rows[table.name] += len(rows)
+            finally:
+                if synchronous is not None:
+                    # The pooled connection outlives the load; give it back as it was.
+                    conn.exec_driver_sql(f"PRAGMA synchronous={int(synchronous)}")
+                    conn.commit()
+    finally:
+        stats.load_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for index in indexes:
+            index.create(bind=engine, checkfirst=True)
+        if search_index:
+            ensure_search_index(engine)
+        stats.index_seconds = time.perf_counter() - started
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            _reset_sequences(conn, tables)
+        conn.exec_driver_sql("ANALYZE")
+    return stats
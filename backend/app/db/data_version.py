@@ -0,0 +1,88 @@
+import threading
+
+from sqlalchemy import Select, event, func, select
+from sqlalchemy.orm import Session
+
+from app.models.audit import ProjectFundingEvent, ProjectUpdate
+from app.models.project import Project
+
+"""
+A process-local write counter for the project portfolio.
+
+Every committed session that inserted, updated or deleted projects, project
+updates or funding events bumps the counter, whether it went through the ORM
+unit of work or a bulk insert()/update() statement.
+
+The counter is per worker process and never sees writes made by other uvicorn
+workers, the seed CLI or psql, so it is not a cache key on its own. Caches and
+HTTP validators (ETags) pair it with a database watermark from
+``project_watermark`` / ``portfolio_watermark``: count and max(updated_at) are
+shared by every writer, and the counter covers this process's writes that land
+within one timestamp tick (SQLite stores CURRENT_TIMESTAMP to the second).
+"""
+
+TRACKED_TABLES = frozenset(
+    model.__table__.name for model in (Project, ProjectUpdate, ProjectFundingEvent)
+)
+_DIRTY_KEY = "portfolio_dirty"
+
+
+class DataVersion:
+    def __init__(self) -> None:
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+portfolio_version = DataVersion()
+
+
+def project_watermark(owner_id: int | None = None) -> Select:
+    """(row count, max(updated_at)) over projects, optionally one owner's; served from indexes."""
+    query = select(func.count(Project.id), func.max(Project.updated_at))
+    if owner_id is not None:
+        query = query.where(Project.owner_id == owner_id)
+    return query
+
+
+def portfolio_watermark() -> Select:
+    """project_watermark plus the newest project update, which moves project cycles."""
+    latest_update = select(func.max(ProjectUpdate.id)).scalar_subquery()
+    return project_watermark().add_columns(latest_update)
+
+
+def _touches_portfolio(objects) -> bool:
+    return any(getattr(obj, "__tablename__", None) in TRACKED_TABLES for obj in objects)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session: Session, _flush_context) -> None:
+    if _touches_portfolio(session.new) or _touches_portfolio(session.dirty) or _touches_portfolio(session.deleted):
+        session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_statement(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if getattr(table, "name", None) in TRACKED_TABLES:
+            state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    if session.info.pop(_DIRTY_KEY, False):
+        portfolio_version.bump()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_on_rollback(session: Session) -> None:
+    session.info.pop(_DIRTY_KEY, None)
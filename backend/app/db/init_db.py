@@ -1,12 +1,24 @@
-from sqlalchemy import inspect, text
+import logging
 
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.audit_partitions import ensure_partitioned as ensure_audit_partitions
 from app.db.base import Base
+from app.db.search import ensure_search_index
 from app.db.session import engine
 
 # Import models so SQLAlchemy knows about them before creating tables.
 from app.models import user  # noqa: F401
 from app.models import project  # noqa: F401
 from app.models import audit  # noqa: F401
+from app.models.audit import ProjectFundingEvent, ProjectFundingMonthly
+from app.models.project import Project
+from app.services.funding import rebuild_funding_rollup
+
+logger = logging.getLogger(__name__)
 
 
 def _cleanup_legacy_project_columns() -> None:
@@ -21,11 +33,74 @@ def _cleanup_legacy_project_columns() -> None:
                 conn.execute(text(f"ALTER TABLE projects DROP COLUMN IF EXISTS {col}"))
 
 
+def _ensure_project_natural_key() -> None:
+    # Tables created before the (title, institution) unique constraint existed
+    # don't get it from create_all, but the ingest upsert relies on it.
+    key = ["title", "institution"]
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        if any(uc["column_names"] == key for uc in inspector.get_unique_constraints("projects")):
+            return
+        if any(ix["unique"] and ix["column_names"] == key for ix in inspector.get_indexes("projects")):
+            return
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_projects_title_institution "
+                    "ON projects (title, institution)"
+                )
+            )
+    except IntegrityError as exc:
+        # Without the index every ingest upsert fails, so don't start half-working.
+        with engine.connect() as conn:
+            duplicates = conn.execute(
+                select(Project.title, Project.institution, func.count())
+                .group_by(Project.title, Project.institution)
+                .having(func.count() > 1)
+                .order_by(func.count().desc())
+                .limit(10)
+            ).all()
+        listed = "; ".join(f"{title!r} / {institution!r} ({count} rows)" for title, institution, count in duplicates)
+        raise RuntimeError(
+            "Cannot create the unique index on projects (title, institution): duplicate rows exist, e.g. "
+            f"{listed}. Merge or rename them (SELECT title, institution, count(*) FROM projects "
+            "GROUP BY 1, 2 HAVING count(*) > 1 lists them all), then restart."
+        ) from exc
+
+
+def _ensure_indexes() -> None:
+    # create_all skips tables that already exist, so indexes added to models later
+    # would never reach existing databases without this.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _backfill_funding_rollup() -> None:
+    # Databases that recorded funding before project_funding_monthly existed get
+    # their rollup built once from the event ledger.
+    with Session(engine) as db:
+        if db.scalar(select(ProjectFundingMonthly.project_id).limit(1)) is not None:
+            return
+        if db.scalar(select(ProjectFundingEvent.id).limit(1)) is None:
+            return
+        buckets = rebuild_funding_rollup(db)
+        db.commit()
+    logger.info("Built %d monthly funding rollup rows from existing funding events", buckets)
+
+
 def init_db() -> None:
     # For MVP simplicity: create tables if they don't exist.
     # In production, use Alembic migrations.
     Base.metadata.create_all(bind=engine)
     _cleanup_legacy_project_columns()
+    _ensure_project_natural_key()
+    ensure_audit_partitions(engine, settings.AUDIT_PARTITION_MONTHS_AHEAD)
+    _ensure_indexes()
+    _backfill_funding_rollup()
+    ensure_search_index(engine)
     # It only creates tables.
 
 """
@@ -0,0 +1,165 @@
+import logging
+import re
+
+from sqlalchemy import column, func, literal, literal_column, or_, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.models.project import Project
+
+"""
+Full-text search over projects (title, domain, institution, description).
+
+Postgres: a generated, weighted ``search_vector`` tsvector column with a GIN
+index, plus a pg_trgm GIN index over the concatenated text so plain substring
+matches (``ILIKE '%q%'``) are index-assisted too. Results rank by ts_rank_cd.
+
+SQLite: an external-content FTS5 table (``projects_fts``) kept in sync by
+triggers, queried with prefix terms and ranked by bm25.
+
+Anything else falls back to the unindexed ILIKE scan with no ranking.
+"""
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "projects_fts"
+TS_CONFIG = "english"
+
+_PG_SEARCH_VECTOR = f"""
+    setweight(to_tsvector('{TS_CONFIG}', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('{TS_CONFIG}', coalesce(domain, '') || ' ' || coalesce(institution, '')), 'B') ||
+    setweight(to_tsvector('{TS_CONFIG}', coalesce(description, '')), 'C')
+"""
+# The substring filter must use this exact expression for the trigram index to apply.
+_PG_SEARCH_TEXT = "(title || ' ' || domain || ' ' || institution || ' ' || coalesce(description, ''))"
+
+_SQLITE_COLUMNS = "title, domain, institution, description"
+_fts_table = table(FTS_TABLE, column("rowid"))
+
+
+def _ensure_postgres(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({_PG_SEARCH_VECTOR}) STORED"
+            )
+        )
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_projects_search_vector ON projects USING gin (search_vector)")
+        )
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_projects_search_trgm "
+                    f"ON projects USING gin ({_PG_SEARCH_TEXT} gin_trgm_ops)"
+                )
+            )
+    except DBAPIError:
+        # Managed databases may not let the app role create extensions; substring
+        # search still works, just without the trigram index.
+        logger.warning("pg_trgm unavailable; substring project search will not be index-assisted")
+
+
+def _ensure_sqlite(engine: Engine) -> None:
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        if exists:
+            return
+
+        conn.execute(
+            text(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({_SQLITE_COLUMNS}, "
+                "content='projects', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON projects BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, {_SQLITE_COLUMNS}) "
+                "VALUES (new.id, new.title, new.domain, new.institution, new.description); END"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON projects BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_SQLITE_COLUMNS}) "
+                "VALUES ('delete', old.id, old.title, old.domain, old.institution, old.description); END"
+            )
+        )
+        conn.execute(
+            text(
+                f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF {_SQLITE_COLUMNS} ON projects BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_SQLITE_COLUMNS}) "
+                "VALUES ('delete', old.id, old.title, old.domain, old.institution, old.description); "
+                f"INSERT INTO {FTS_TABLE}(rowid, {_SQLITE_COLUMNS}) "
+                "VALUES (new.id, new.title, new.domain, new.institution, new.description); END"
+            )
+        )
+        # Index rows that existed before the FTS table did.
+        conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def ensure_search_index(engine: Engine) -> None:
+    if engine.dialect.name == "postgresql":
+        _ensure_postgres(engine)
+    elif engine.dialect.name == "sqlite":
+        _ensure_sqlite(engine)
+
+
+def drop_search_index(engine: Engine) -> None:
+    """Remove the search index so a bulk load doesn't maintain it row by row.
+
+    ``ensure_search_index`` recreates it (and indexes every row) afterwards. The
+    Postgres ``search_vector`` column stays: it is computed on insert either way.
+    """
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("DROP INDEX IF EXISTS ix_projects_search_vector"))
+            conn.execute(text("DROP INDEX IF EXISTS ix_projects_search_trgm"))
+        elif engine.dialect.name == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def _terms(q: str) -> list[str]:
+    return re.findall(r"\w+", q.lower())
+
+
+def apply_search(query, dialect: str, q: str):
+    """Filter ``query`` (over ``Project``) to rows matching ``q``.
+
+    Returns ``(query, rank)`` where a higher ``rank`` means a better match.
+    Every term is treated as a prefix, so results keep up with each keystroke.
+    """
+    terms = _terms(q)
+    if dialect == "postgresql" and terms:
+        tsquery = func.to_tsquery(TS_CONFIG, " & ".join(f"{t}:*" for t in terms))
+        search_vector = literal_column("projects.search_vector")
+        query = query.filter(
+            or_(search_vector.op("@@")(tsquery), literal_column(_PG_SEARCH_TEXT).ilike(f"%{q.strip()}%"))
+        )
+        return query, func.ts_rank_cd(search_vector, tsquery)
+
+    if dialect == "sqlite" and terms:
+        fts = literal_column(FTS_TABLE)
+        match = " ".join(f'"{t}"*' for t in terms)
+        query = query.join(_fts_table, _fts_table.c.rowid == Project.id).filter(fts.op("MATCH")(match))
+        # bm25 is "lower is better"; negate it and weight title matches highest.
+        return query, -func.bm25(fts, 10.0, 4.0, 4.0, 1.0)
+
+    like = f"%{q.strip()}%"
+    query = query.filter(
+        (Project.title.ilike(like))
+        | (Project.domain.ilike(like))
+        | (Project.institution.ilike(like))
+        | (Project.description.ilike(like))
+    )
+    return query, literal(0.0)
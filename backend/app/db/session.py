@@ -1,5 +1,10 @@
-from sqlalchemy import create_engine
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
 
 from app.core.config import settings
 
@@ -7,9 +12,13 @@ from app.core.config import settings
 settings.DATABASE_URL: This uses the address we saw earlier (postgresql://...). 
 It's like the GPS coordinates for the database.
 
-pool_pre_ping=True: This is a "health check" feature. Before the app tries to use a connection, 
-it "pings" the database to make sure it's still awake. If the connection has died 
-(common if the database was idle), it transparently restarts it so your app doesn't crash.
+Pool options come from settings (DB_POOL_*): each engine keeps DB_POOL_SIZE connections open
+plus up to DB_MAX_OVERFLOW extra under load, per worker process. Connections older than
+DB_POOL_RECYCLE_SECONDS are replaced, so idle ones dropped by a firewall or the server are not
+reused. DB_POOL_PRE_PING additionally "pings" every connection on checkout (one extra round-trip
+per request); without it a connection that died anyway fails one request and the whole pool is
+refreshed. DB_NULL_POOL opens a connection per checkout instead, for when PgBouncer (or another
+external pooler) does the pooling. DB_STATEMENT_TIMEOUT_MS caps every statement on Postgres.
 
 --------------------------
 
@@ -20,16 +29,102 @@ autoflush=False: This tells SQLAlchemy not to send data to the database until yo
 
 bind=engine: This connects this session factory to the specific "Pump" (Engine) we created above.
 """
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True) # The physical connection that stays open
+
+
+def engine_options(url: str | URL, *, is_async: bool = False) -> dict[str, Any]:
+    parsed = make_url(url)
+    options: dict[str, Any] = {}
+    if settings.DB_NULL_POOL:
+        options["poolclass"] = NullPool
+    else:
+        options["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE_SECONDS
+        # Sizing only applies to queue pools; SQLite's async driver and :memory: databases use others.
+        if issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+            options["pool_size"] = settings.DB_POOL_SIZE
+            options["max_overflow"] = settings.DB_MAX_OVERFLOW
+            options["pool_timeout"] = settings.DB_POOL_TIMEOUT_SECONDS
+
+    if parsed.get_backend_name() == "postgresql":
+        connect_args: dict[str, Any] = {}
+        timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+        if is_async:
+            if timeout_ms:
+                connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+            if settings.DB_NULL_POOL:
+                # PgBouncer in transaction mode can't keep asyncpg's prepared statements.
+                connect_args["prepared_statement_cache_size"] = 0
+                connect_args["statement_cache_size"] = 0
+        elif timeout_ms:
+            connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+        if connect_args:
+            options["connect_args"] = connect_args
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL)) # The physical connection that stays open
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 """
-This file is the Plumbing System of your backend. If the Database is a "Water Tank," 
-this code sets up the Main Pump and the Faucets that your application uses to get data.
+The async pump and faucets, for `async def` routes (assistant, analytics reads, project reads).
+
+A sync Session used inside an `async def` route blocks the whole event loop while it waits
+for the database, so every other request stalls. AsyncSession awaits instead. It talks to
+the same database through an async driver (asyncpg for Postgres, aiosqlite for SQLite),
+picked from DATABASE_URL unless ASYNC_DATABASE_URL says otherwise.
+
+expire_on_commit=False: objects stay readable after commit without another (awaited) query.
+"""
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url: str) -> URL:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return parsed
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}")
+
+
+_async_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+# SQLite (local dev) is now read through two pools at once. In WAL mode readers don't block
+# the writer, and busy_timeout makes a second writer wait for the lock instead of failing.
+def _sqlite_pragmas(dbapi_connection, _record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
 
-If you tried to talk to the database without an Engine, it would be like trying to call someone without a phone line or a cellular network. 
-You might know their number (URL), and you might know what you want to say (Session), but you have no medium to carry the voice.
+for _engine in (engine, async_engine.sync_engine):
+    if _engine.dialect.name == "sqlite":
+        event.listen(_engine, "connect", _sqlite_pragmas)
 
-The Engine is that medium. It stays in the background, making sure the "line" is always clear and hasn't dropped (pool_pre_ping=True).
 
-"""
\ No newline at end of file
+# Live utilization of one engine's pool, for the admin pool endpoint. Counts come from the
+# pool's public API; the configured limits from settings, which the engines were built from.
+def pool_status(engine: Engine) -> dict[str, Any]:
+    pool = engine.pool
+    status: dict[str, Any] = {"dialect": engine.dialect.name, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        checked_out = pool.checkedout()
+        max_overflow = settings.DB_MAX_OVERFLOW
+        capacity = size + max_overflow if max_overflow >= 0 else None
+        status.update(
+            size=size,
+            max_overflow=max_overflow,
+            checked_in=pool.checkedin(),
+            checked_out=checked_out,
+            overflow=max(pool.overflow(), 0),
+            utilization=round(checked_out / capacity, 3) if capacity else None,
+            timeout_seconds=pool.timeout(),
+        )
+    if not settings.DB_NULL_POOL:
+        status["recycle_seconds"] = settings.DB_POOL_RECYCLE_SECONDS
+        status["pre_ping"] = settings.DB_POOL_PRE_PING
+    return status
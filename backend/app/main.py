@@ -1,15 +1,21 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
+from app.api.deps import resolve_request_user
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.security import hash_password
+from app.core.metrics import MetricsMiddleware, instrument_engine, render as render_metrics
+from app.core.profiler import SQLProfilerMiddleware, profile_engine
+from app.core.security import PasswordHasherBusy, password_hasher
 from app.db.init_db import init_db
-from app.db.session import SessionLocal
-from app.models.audit import AuditLog
+from app.db.session import SessionLocal, async_engine, engine
 from app.models.user import User
-from app.api.routes import auth, projects, analytics, ingest, assistant
+from app.services.audit_retention import audit_maintenance
+from app.services.audit_writer import audit_writer
+from app.services.llm_clients import llm_clients
+from app.api.routes import auth, projects, analytics, ingest, assistant, audit, admin
 #12
 #123
 # If the table is empty, it automatically creates two "Demo" users: a Management user and a Researcher user.
@@ -20,12 +26,14 @@ def _seed_users() -> None:
     db: Session = SessionLocal()
     try:
         if db.query(User).count() == 0:
+            # Both demo hashes are computed at once in the password hasher's pool.
+            management_hash, researcher_hash = password_hasher.hash_many(["password", "password"])
             db.add(
                 User(
                     email="management@example.com",
                     full_name="Demo Management",
                     role="management",
-                    hashed_password=hash_password("password"),
+                    hashed_password=management_hash,
                 )
             )
             db.add(
@@ -33,7 +41,7 @@ def _seed_users() -> None:
                     email="researcher@example.com",
                     full_name="Demo Researcher",
                     role="researcher",
-                    hashed_password=hash_password("password"),
+                    hashed_password=researcher_hash,
                 )
             )
             db.commit() # Save these IDs into the permanent filing cabinet (the Database).
@@ -60,29 +68,16 @@ app.add_middleware(
     allow_credentials=True, # It’s okay to send sensitive info.
     allow_methods=["*"], # This defines what actions the guest can take. Using ["*"] means: "I allow all types of actions."
     allow_headers=["*"], # what extra info can be sent in the request "envelope". ["*"] means: "I accept all types of headers."
+    expose_headers=["X-Next-Cursor", "X-Total-Count"], # pagination headers the frontend is allowed to read.
 )
 
 
 @app.middleware("http")
 async def audit_request_middleware(request: Request, call_next):
     # Record every authenticated API action as a durable audit trail.
-    actor_user_id: int | None = None
-    auth_header = request.headers.get("Authorization", "")
-    if auth_header.startswith("Bearer "):
-        token = auth_header.split(" ", 1)[1].strip()
-        try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            email = payload.get("sub")
-            if email:
-                db = SessionLocal()
-                try:
-                    user = db.query(User).filter(User.email == email).first()
-                    if user:
-                        actor_user_id = user.id
-                finally:
-                    db.close()
-        except JWTError:
-            pass
+    # The resolved user stays on request.state, so get_current_user reuses it.
+    user = await resolve_request_user(request)
+    actor_user_id: int | None = user.id if user is not None else None
 
     status_code = 500
     response = None
@@ -91,30 +86,52 @@ async def audit_request_middleware(request: Request, call_next):
         status_code = response.status_code
     finally:
         if actor_user_id is not None:
-            db = SessionLocal()
-            try:
-                db.add(
-                    AuditLog(
-                        actor_user_id=actor_user_id,
-                        action="API_CALL",
-                        entity_type="API",
-                        entity_id=0,
-                        diff_json=AuditLog.dumps(
-                            {
-                                "method": request.method,
-                                "path": request.url.path,
-                                "query": request.url.query,
-                                "status_code": status_code,
-                            }
-                        ),
-                    )
-                )
-                db.commit()
-            finally:
-                db.close()
+            # Queued for the background writer so the insert stays off the response path.
+            await audit_writer.submit(
+                actor_user_id=actor_user_id,
+                action="API_CALL",
+                entity_type="API",
+                entity_id=0,
+                diff={
+                    "method": request.method,
+                    "path": request.url.path,
+                    "query": request.url.query,
+                    "status_code": status_code,
+                },
+            )
 
     return response
 
+# Registered after the audit middleware, so it wraps it and compresses the final body.
+if settings.RESPONSE_COMPRESSION:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+# Profiled requests (see SQL_PROFILER_ENABLED) get per-route SQL totals, slow/N+1 logs and Server-Timing.
+if settings.SQL_PROFILER_ENABLED or settings.DEBUG or settings.ENV != "prod":
+    profile_engine(engine)
+    profile_engine(async_engine.sync_engine)
+    app.add_middleware(SQLProfilerMiddleware)
+
+# Outermost, so latency covers the whole stack and sizes are the bytes actually sent.
+if settings.METRICS_ENABLED:
+    instrument_engine("sync", engine)
+    instrument_engine("async", async_engine.sync_engine)
+    app.add_middleware(MetricsMiddleware)
+
+# The password hasher's queue is full: ask the client to retry instead of queueing more bcrypt work.
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(_request: Request, _exc: PasswordHasherBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 # Your app is split into different files (Auth, Projects, Analytics). 
 # These lines act like extension cords, plugging those specific features into the main app.
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
@@ -122,14 +139,66 @@ app.include_router(projects.router, prefix=settings.API_V1_PREFIX)
 app.include_router(analytics.router, prefix=settings.API_V1_PREFIX)
 app.include_router(ingest.router, prefix=settings.API_V1_PREFIX)
 app.include_router(assistant.router, prefix=settings.API_V1_PREFIX)
+app.include_router(audit.router, prefix=settings.API_V1_PREFIX)
+app.include_router(admin.router, prefix=settings.API_V1_PREFIX)
 
 # This function runs automatically the moment you start the server.
 @app.on_event("startup")
 def on_startup() -> None:
     init_db() # Checks the database and creates any missing tables.
+    password_hasher.start() # starts the bcrypt worker processes.
     _seed_users() # adds the "Demo" users if the database is empty.
 
 
+@app.on_event("startup")
+async def start_audit_writer() -> None:
+    await audit_writer.start()
+
+
+# Creates upcoming audit partitions and archives expired audit months in the background.
+@app.on_event("startup")
+async def start_audit_maintenance() -> None:
+    audit_maintenance.start()
+
+
+# Drain queued audit entries before the process exits.
+@app.on_event("shutdown")
+async def stop_audit_writer() -> None:
+    await audit_writer.stop()
+
+
+@app.on_event("shutdown")
+async def stop_audit_maintenance() -> None:
+    await audit_maintenance.stop()
+
+
+# Close pooled async database connections.
+@app.on_event("shutdown")
+async def dispose_async_engine() -> None:
+    await async_engine.dispose()
+
+
+# Stop the bcrypt worker processes.
+@app.on_event("shutdown")
+def stop_password_hasher() -> None:
+    password_hasher.shutdown()
+
+
+# Close pooled LLM provider connections.
+@app.on_event("shutdown")
+async def close_llm_clients() -> None:
+    await llm_clients.aclose()
+
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+# Prometheus scrape target; 404 when metrics are disabled.
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
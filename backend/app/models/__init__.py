@@ -1,5 +1,5 @@
 from app.models.user import User
 from app.models.project import Project
-from app.models.audit import AuditLog, ProjectFundingEvent, ProjectUpdate
+from app.models.audit import AuditLog, ProjectFundingEvent, ProjectFundingMonthly, ProjectUpdate
 
-__all__ = ["User", "Project", "AuditLog", "ProjectUpdate", "ProjectFundingEvent"]
+__all__ = ["User", "Project", "AuditLog", "ProjectUpdate", "ProjectFundingEvent", "ProjectFundingMonthly"]
@@ -1,6 +1,6 @@
 import json
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -8,6 +8,14 @@ from app.db.base import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    # Per-entity history and per-actor activity, both in time order. created_at alone serves
+    # time-range scans and the retention job. On Postgres the table is range-partitioned by
+    # month on created_at (see app.db.audit_partitions), so these are partitioned indexes.
+    __table_args__ = (
+        Index("ix_audit_logs_entity_created", "entity_type", "entity_id", "created_at"),
+        Index("ix_audit_logs_actor_created", "actor_user_id", "created_at"),
+        Index("ix_audit_logs_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     actor_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -28,6 +36,8 @@ class AuditLog(Base):
 
 class ProjectUpdate(Base):
     __tablename__ = "project_updates"
+    # Serves the per-project "latest Completed update" lookup behind project cycles.
+    __table_args__ = (Index("ix_project_updates_project_status_created", "project_id", "status", "created_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
@@ -53,3 +63,24 @@ class ProjectFundingEvent(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     project = relationship("Project", back_populates="funding_events")
+
+
+class ProjectFundingMonthly(Base):
+    """Funding events rolled up per project, domain and calendar month (UTC).
+
+    Maintained in the same transaction as every ProjectFundingEvent insert, so
+    spend-over-time queries read one row per bucket instead of every event.
+    The domain is the project's domain when the money was recorded.
+    """
+
+    __tablename__ = "project_funding_monthly"
+    __table_args__ = (Index("ix_project_funding_monthly_domain_month", "domain", "month"),)
+
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), primary_key=True)
+    domain: Mapped[str] = mapped_column(String(128), primary_key=True)
+    month: Mapped[Date] = mapped_column(Date, primary_key=True)  # first day of the month
+
+    amount_sgd: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    project = relationship("Project", back_populates="funding_rollups")
@@ -5,7 +5,9 @@ from sqlalchemy import (
     DateTime,
     Text,
     ForeignKey,
+    Index,
     Numeric,
+    UniqueConstraint,
     func,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -15,6 +17,14 @@ from app.db.base import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    # AMGrant ingest upserts on (title, institution), so the pair must be unique.
+    # (updated_at, id) and (owner_id, updated_at) serve the newest-first project list and the
+    # count/max(updated_at) watermark behind its ETag, for everyone and for one researcher.
+    __table_args__ = (
+        UniqueConstraint("title", "institution", name="uq_projects_title_institution"),
+        Index("ix_projects_updated_at_id", "updated_at", "id"),
+        Index("ix_projects_owner_updated_at", "owner_id", "updated_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
 
@@ -43,3 +53,4 @@ class Project(Base):
 
     updates = relationship("ProjectUpdate", back_populates="project", cascade="all, delete-orphan")
     funding_events = relationship("ProjectFundingEvent", back_populates="project", cascade="all, delete-orphan")
+    funding_rollups = relationship("ProjectFundingMonthly", back_populates="project", cascade="all, delete-orphan")
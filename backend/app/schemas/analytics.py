@@ -1,3 +1,6 @@
+from datetime import date
+from typing import Literal
+
 from pydantic import BaseModel
 
 
@@ -22,6 +25,19 @@ class ProjectCycle(BaseModel):
     spent_sgd: float
 
 
+class ProjectCyclePage(BaseModel):
+    items: list[ProjectCycle]
+    next_cursor: str | None = None
+
+
+class CycleDurationStats(BaseModel):
+    key: str
+    count: int
+    p50_days: float
+    p90_days: float
+    max_days: int
+
+
 class PortfolioSnapshot(BaseModel):
     total_projects: int
     active_projects: int
@@ -29,4 +45,20 @@ class PortfolioSnapshot(BaseModel):
     by_institution: list[CountByKey]
     by_domain: list[CountByKey]
     funding_by_domain: list[FundingByKey]
-    project_cycles: list[ProjectCycle]
+    # Per-project cycles are paged from /analytics/project-cycles.
+    cycle_duration_by_domain: list[CycleDurationStats]
+
+
+class FundingTimeseriesPoint(BaseModel):
+    period: str  # "2025-03", "2025-Q1" or "2025"
+    period_start: date
+    amount_sgd: float
+    cumulative_sgd: float
+    events: int
+
+
+class FundingTimeseries(BaseModel):
+    period: Literal["month", "quarter", "year"]
+    domain: str | None = None
+    project_id: int | None = None
+    points: list[FundingTimeseriesPoint]
@@ -17,3 +17,4 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     reply: str
     provider: Literal["openai", "ollama", "local", "fallback"] = "fallback"
+    cached: bool = False
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.project import ProjectFundingEventOut, ProjectUpdateOut
+
+
+class AuditLogOut(BaseModel):
+    id: int
+    actor_user_id: int
+    action: str
+    entity_type: str
+    entity_id: int
+    diff_json: str | None
+    created_at: datetime
+
+
+class AuditLogPage(BaseModel):
+    items: list[AuditLogOut]
+    next_cursor: str | None = None
+
+
+class ProjectUpdatePage(BaseModel):
+    items: list[ProjectUpdateOut]
+    next_cursor: str | None = None
+
+
+class FundingEventPage(BaseModel):
+    items: list[ProjectFundingEventOut]
+    next_cursor: str | None = None
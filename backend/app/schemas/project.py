@@ -1,5 +1,7 @@
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -34,6 +36,25 @@ class ProjectUpdate(ProjectBase):
     ai_type: str | None = None
 
 
+# One element of the PATCH /projects/batch array: which project, plus the fields to change.
+class ProjectBatchUpdateItem(ProjectUpdate):
+    id: int
+
+
+class ProjectBatchItemResult(BaseModel):
+    index: int  # position in the request array
+    status: Literal["created", "updated", "failed", "skipped"]
+    id: int | None = None
+    error: str | None = None
+
+
+class ProjectBatchResult(BaseModel):
+    mode: Literal["atomic", "best_effort"]
+    applied: int
+    failed: int
+    results: list[ProjectBatchItemResult]
+
+
 class ProjectOut(ProjectBase):
     # adds fields that the database generates automatically (like the ID and timestamps).
     id: int
@@ -42,6 +63,25 @@ class ProjectOut(ProjectBase):
     updated_at: datetime
 
 
+# One row of GET /projects. Every column is optional because `fields=` may project a subset.
+class ProjectListItem(BaseModel):
+    id: int
+    title: str | None = None
+    institution: str | None = None
+    domain: str | None = None
+    ai_type: str | None = None
+    maturity_stage: str | None = None
+    status: str | None = None
+    data_sensitivity: str | None = None
+    funding_amount_sgd: Decimal | None = None
+    start_date: date | None = None
+    end_date: date | None = None
+    description: str | None = None
+    owner_id: int | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
 class ProjectUpdateCreate(BaseModel):
     status: str = "Update"
     note: str
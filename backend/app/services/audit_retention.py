@@ -0,0 +1,295 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.db import audit_partitions
+from app.db.audit_partitions import add_months, month_start
+from app.db.session import engine
+from app.models.audit import AuditLog
+
+"""
+Audit log retention: archive old months to gzipped JSONL, then remove them.
+
+Every month that ended more than ``AUDIT_RETENTION_DAYS`` ago is written to
+``AUDIT_ARCHIVE_DIR/audit_logs_YYYY-MM.jsonl.gz`` (one JSON object per row,
+streamed from a server-side cursor) and only then removed from the database:
+
+- Postgres: the month is archived while its partition is still attached
+  (a plain read that blocks nobody), then the partition is detached and
+  dropped in a short second transaction (the detach runs ``CONCURRENTLY``
+  beforehand on Postgres 14+ when the table has no default partition, which
+  Postgres requires), so no row-by-row DELETE, no dead tuples and nothing for VACUUM
+  to clean up afterwards. Stray rows for that month in the default partition
+  are archived and deleted.
+- Elsewhere: the month's rows are archived, then deleted by created_at range.
+
+Months past the retention window get no new audit rows (``created_at`` is the
+insert time), so nothing lands between the archive and the removal. The
+archive file is fsynced and renamed into place before the removal starts. If a
+run dies between the two, the next run rewrites the same file with the month's
+rows plus any records only the old file had, so each month keeps one archive
+without duplicates and no rows are lost.
+
+Retention is off unless ``AUDIT_RETENTION_DAYS`` is set, and then only runs
+with an ``AUDIT_ARCHIVE_DIR`` that is an absolute, existing, writable
+directory: a relative path would land in the container's throwaway filesystem.
+
+``AuditMaintenance`` runs this (plus creating upcoming partitions) on an
+interval inside the app; a Postgres advisory lock keeps several workers from
+doing the same month at once.
+"""
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ("id", "actor_user_id", "action", "entity_type", "entity_id", "diff_json", "created_at")
+_ADVISORY_LOCK_KEY = 0x4A7D17  # arbitrary, shared by every worker
+
+
+def archive_dir_error(archive_dir: str | None) -> str | None:
+    """Why ``archive_dir`` can't hold retention archives, or None when it can."""
+    if not archive_dir:
+        return "AUDIT_ARCHIVE_DIR is not set"
+    if not os.path.isabs(archive_dir):
+        return f"AUDIT_ARCHIVE_DIR must be an absolute path, got {archive_dir!r}"
+    if not os.path.isdir(archive_dir):
+        return f"AUDIT_ARCHIVE_DIR {archive_dir!r} does not exist or is not a directory"
+    if not os.access(archive_dir, os.W_OK | os.X_OK):
+        return f"AUDIT_ARCHIVE_DIR {archive_dir!r} is not writable"
+    return None
+
+
+def _archive_path(archive_dir: str, month: date) -> str:
+    return os.path.join(archive_dir, f"audit_logs_{month:%Y-%m}.jsonl.gz")
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).isoformat()
+    return value
+
+
+def _write_archive(conn: Connection, queries: list, path: str) -> int:
+    """Stream every query's rows into ``path`` as gzipped JSONL; returns the rows written.
+
+    Records of an existing archive at ``path`` that weren't written again (same id and
+    created_at) are carried over, so retrying a month rewrites its one file instead of
+    adding another.
+    """
+    tmp_path = f"{path}.tmp"
+    written = 0
+    keys = set()
+    with open(tmp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as fh:
+        for query in queries:
+            for row in conn.execute(query, execution_options={"yield_per": 5000}):
+                record = {name: _jsonable(value) for name, value in zip(ARCHIVE_COLUMNS, row)}
+                fh.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n")
+                keys.add((record["id"], record["created_at"]))
+                written += 1
+        if written and os.path.exists(path):
+            with gzip.open(path, "rb") as previous:
+                for line in previous:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if (record["id"], record["created_at"]) not in keys:
+                        fh.write(line)
+        fh.close()
+        raw.flush()
+        os.fsync(raw.fileno())
+    if written:
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+    return written
+
+
+def _month_range(month: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc)
+    end = datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc)
+    return start, end
+
+
+def _detach_partition(bind: Engine, partition: str) -> bool:
+    """Detach ``partition`` without blocking audit_logs; False when only a plain DETACH is possible."""
+    if bind.dialect.server_version_info < (14,):
+        return False
+    # CONCURRENTLY can't run in a transaction block, and Postgres refuses it while the parent
+    # has a default partition. A detach interrupted earlier is left pending and must be
+    # finished with FINALIZE instead.
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        row = conn.execute(
+            text(
+                "SELECT i.inhdetachpending, p.partdefid <> 0 FROM pg_inherits i "
+                "JOIN pg_partitioned_table p ON p.partrelid = i.inhparent "
+                "WHERE i.inhrelid = to_regclass(:name)"
+            ),
+            {"name": partition},
+        ).one_or_none()
+        if row is None:  # already detached
+            return True
+        pending, has_default = row
+        if not pending and has_default:
+            return False
+        mode = "FINALIZE" if pending else "CONCURRENTLY"
+        conn.execute(text(f"ALTER TABLE {audit_partitions.PARENT} DETACH PARTITION {partition} {mode}"))
+    return True
+
+
+def _archive_month(bind: Engine, month: date, partition: str | None, archive_dir: str) -> tuple[int, bool]:
+    """Archive and remove one month; returns (rows archived, whether a partition was dropped)."""
+    start, end = _month_range(month)
+    in_month = (AuditLog.created_at >= start) & (AuditLog.created_at < end)
+    columns = [AuditLog.__table__.c[name] for name in ARCHIVE_COLUMNS]
+
+    # Archive while the partition is still attached: a plain read, so audit inserts and reads
+    # carry on however long the file takes to write. On Postgres this covers the month's
+    # partition and any strays for it in the default partition.
+    with bind.connect() as conn:
+        archived = _write_archive(
+            conn, [select(*columns).where(in_month).order_by(AuditLog.id)], _archive_path(archive_dir, month)
+        )
+
+    # Then remove the month in a short transaction; the parent is only locked for the DDL itself.
+    detached = partition is not None and _detach_partition(bind, partition)
+    with bind.begin() as conn:
+        if partition is not None:
+            if not detached:
+                conn.execute(text(f"ALTER TABLE {audit_partitions.PARENT} DETACH PARTITION {partition}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {partition}"))
+        conn.execute(delete(AuditLog).where(in_month))
+    return archived, partition is not None
+
+
+def _expired_months(conn: Connection, cutoff: date, partitions: dict[date, str]) -> list[date]:
+    oldest = conn.execute(select(func.min(AuditLog.created_at))).scalar()
+    months = {m for m in partitions if m < cutoff}
+    if oldest is not None:
+        month = month_start(oldest)
+        while month < cutoff:
+            months.add(month)
+            month = add_months(month, 1)
+    return sorted(months)
+
+
+def apply_retention(bind: Engine, retention_days: int, archive_dir: str | None) -> dict[str, int]:
+    """Archive and remove every month that ended more than ``retention_days`` ago."""
+    result = {"months": 0, "rows": 0, "partitions_dropped": 0}
+    if retention_days <= 0:
+        return result
+    error = archive_dir_error(archive_dir)
+    if error is not None:
+        raise RuntimeError(f"Audit retention refused: {error}")
+
+    # Only whole months: a month is removed once its last day is past the retention window.
+    cutoff = month_start(datetime.now(timezone.utc) - timedelta(days=retention_days))
+    postgres = bind.dialect.name == "postgresql"
+
+    with bind.connect() as conn:
+        partitions = audit_partitions.list_partitions(conn) if postgres else {}
+        months = _expired_months(conn, cutoff, partitions)
+
+    for month in months:
+        rows, dropped = _archive_month(bind, month, partitions.get(month), archive_dir)
+        if rows or dropped:
+            result["months"] += 1
+            result["rows"] += rows
+            result["partitions_dropped"] += int(dropped)
+            logger.info("Archived %d audit rows for %s", rows, f"{month:%Y-%m}")
+    return result
+
+
+class AuditMaintenance:
+    """Periodic audit storage upkeep: upcoming partitions, then retention."""
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.failed_runs = 0
+        self.archived_rows = 0
+        self.archived_months = 0
+        self.partitions_dropped = 0
+        self.last_run_at: str | None = None
+        self.last_duration_ms: float | None = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "retention_days": settings.AUDIT_RETENTION_DAYS,
+            "archive_dir": settings.AUDIT_ARCHIVE_DIR,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "archived_rows": self.archived_rows,
+            "archived_months": self.archived_months,
+            "partitions_dropped": self.partitions_dropped,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+        }
+
+    def run_once(self) -> None:
+        started = time.perf_counter()
+        postgres = engine.dialect.name == "postgresql"
+        with engine.connect() as lock_conn:
+            if postgres:
+                locked = lock_conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": _ADVISORY_LOCK_KEY}).scalar()
+                lock_conn.commit()
+                if not locked:
+                    return  # another worker is on it
+            try:
+                if postgres:
+                    audit_partitions.ensure_partitions(
+                        engine, month_start(datetime.now(timezone.utc)), settings.AUDIT_PARTITION_MONTHS_AHEAD
+                    )
+                result = apply_retention(engine, settings.AUDIT_RETENTION_DAYS, settings.AUDIT_ARCHIVE_DIR)
+            finally:
+                if postgres:
+                    lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _ADVISORY_LOCK_KEY})
+                    lock_conn.commit()
+
+        self.runs += 1
+        self.archived_rows += result["rows"]
+        self.archived_months += result["months"]
+        self.partitions_dropped += result["partitions_dropped"]
+        self.last_run_at = datetime.now(timezone.utc).isoformat()
+        self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception:
+                self.failed_runs += 1
+                logger.exception("Audit maintenance run failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self.interval_seconds <= 0 or (self._task is not None and not self._task.done()):
+            return
+        if settings.AUDIT_RETENTION_DAYS > 0:
+            # Deleting audit history needs a durable archive; fail the startup rather than lose it.
+            error = archive_dir_error(settings.AUDIT_ARCHIVE_DIR)
+            if error is not None:
+                raise RuntimeError(f"AUDIT_RETENTION_DAYS is set but {error}; refusing to start audit retention")
+        self._task = asyncio.create_task(self._run(), name="audit-maintenance")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+audit_maintenance = AuditMaintenance(settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS)
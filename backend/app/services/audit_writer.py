@@ -0,0 +1,274 @@
+import asyncio
+import contextlib
+import fcntl
+import glob
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+
+_STOP = object()
+
+
+class AuditWriter:
+    """Background writer for high-volume audit rows (one per authenticated API call).
+
+    Entries go into a bounded in-process queue and a single task flushes them with
+    multi-row inserts once ``batch_size`` entries are waiting or the oldest one has
+    waited ``flush_interval`` seconds. When the queue is full the overflow policy
+    decides: ``block`` waits for room, ``drop`` discards the entry, ``spill`` appends
+    it to a local JSONL file that is replayed into the database on the next start.
+
+    Every worker shares the spill file. A replay first renames it to a name of its
+    own, which only one worker can do, and appends re-check the file under an
+    ``flock`` so none land in a file that was already claimed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow_policy: str,
+        spill_path: str,
+    ) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"AUDIT_OVERFLOW_POLICY must be one of {OVERFLOW_POLICIES}, got {overflow_policy!r}")
+
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.spill_path = spill_path
+
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._spill_lock = threading.Lock()
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_maxsize": self.maxsize,
+            "overflow_policy": self.overflow_policy,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        await asyncio.to_thread(self._replay_spill)
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._run(), name="audit-writer")
+
+    async def stop(self) -> None:
+        """Flush everything still queued, then stop the writer task."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                leftover.append(item)
+        if leftover:
+            await self._flush(leftover)
+
+    async def submit(
+        self,
+        *,
+        actor_user_id: int,
+        action: str,
+        entity_type: str,
+        entity_id: int,
+        diff: dict | None = None,
+    ) -> None:
+        entry = {
+            "actor_user_id": actor_user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "diff_json": AuditLog.dumps(diff) if diff else None,
+            # Stamp now, not at flush time, so the row reflects when the call happened.
+            "created_at": datetime.now(timezone.utc),
+        }
+        self.enqueued += 1
+
+        if not self.running:
+            # Outside the app lifespan (scripts, bare test clients): write through.
+            await self._flush([entry])
+            return
+
+        if self.overflow_policy == "block":
+            await self._queue.put(entry)
+            return
+
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            if self.overflow_policy == "drop":
+                self.dropped += 1
+            else:
+                await asyncio.to_thread(self._spill, [entry])
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception:
+            # Never lose audit rows to a transient DB error: park them on disk instead.
+            self.failed_flushes += 1
+            logger.exception("Audit flush of %d entries failed; spilling to %s", len(batch), self.spill_path)
+            await asyncio.to_thread(self._spill, batch)
+            return
+        self.flushes += 1
+        self.written += len(batch)
+
+    @staticmethod
+    def _write(batch: list[dict[str, Any]]) -> None:
+        with SessionLocal() as db:
+            db.execute(insert(AuditLog), batch)
+            db.commit()
+
+    def _spill(self, batch: list[dict[str, Any]]) -> None:
+        data = "".join(json.dumps(entry | {"created_at": entry["created_at"].isoformat()}) + "\n" for entry in batch)
+        with self._spill_lock:
+            while True:
+                fh = open(self.spill_path, "a", encoding="utf-8")
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                # A replay may have claimed the file between the open and the lock.
+                if _is_linked(fh, self.spill_path):
+                    break
+                fh.close()
+            with fh:
+                fh.write(data)
+        self.spilled += len(batch)
+
+    def _replay_spill(self) -> None:
+        # Rename the shared file to a name of our own, so when several workers start at once
+        # exactly one of them replays it. Files left by a worker that died mid-replay are
+        # picked up too; one still being replayed is locked by its worker and skipped.
+        claimed = f"{self.spill_path}.{os.getpid()}-{time.time_ns()}.replay"
+        with contextlib.suppress(FileNotFoundError):
+            os.replace(self.spill_path, claimed)
+        for path in sorted(glob.glob(f"{glob.escape(self.spill_path)}.*.replay")):
+            self._replay_file(path, wait=path == claimed)
+
+    def _replay_file(self, path: str, wait: bool) -> None:
+        offset_path = f"{path}.offset"
+        with open(path, "rb") as fh:
+            try:
+                # Waiting only for our own file, where an append begun before the rename may still be running.
+                fcntl.flock(fh, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            if not _is_linked(fh, path):
+                return  # another worker finished it while we waited for the lock
+
+            # Committed batches are recorded as a byte offset, so a failure further on
+            # doesn't insert them a second time when the file is picked up again.
+            with contextlib.suppress(FileNotFoundError):
+                with open(offset_path, encoding="utf-8") as offset_fh:
+                    fh.seek(int(offset_fh.read()))
+            replayed = 0
+            while lines := list(itertools.islice(fh, self.batch_size)):
+                entries = [json.loads(line) for line in lines if line.strip()]
+                for entry in entries:
+                    entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+                if entries:
+                    self._write(entries)
+                replayed += len(entries)
+                _write_offset(offset_path, fh.tell())
+
+            os.remove(path)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(offset_path)
+
+        if replayed:
+            logger.info("Replayed %d spilled audit entries from %s", replayed, path)
+
+
+def _is_linked(fh, path: str) -> bool:
+    """Whether the open file ``fh`` is still the one at ``path``."""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fh.fileno())
+    return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+
+def _write_offset(path: str, offset: int) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        fh.write(str(offset))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+audit_writer = AuditWriter(
+    maxsize=settings.AUDIT_QUEUE_MAXSIZE,
+    batch_size=settings.AUDIT_FLUSH_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    overflow_policy=settings.AUDIT_OVERFLOW_POLICY,
+    spill_path=settings.AUDIT_SPILL_PATH,
+)
@@ -0,0 +1,103 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.data_version import portfolio_version
+from app.models.user import User
+from app.services.retrieval import tokenize
+
+"""
+Response cache for the assistant.
+
+Management users tend to ask the same handful of questions ("portfolio
+summary", "funding by domain") against data that hasn't changed. A reply is
+reused when the normalized question, the visible scope, the provider/model and
+the portfolio data version all match, so a hit skips both the context queries
+and the LLM call. The data version is the portfolio's database watermark
+(shared by every worker, so writes elsewhere are seen) plus the process write
+counter; any project write makes every older entry unreachable, and they age
+out through LRU/TTL eviction and a byte cap.
+
+Only opening questions are cached: once the conversation has earlier user turns
+the right answer depends on them (and retrieval uses them), so those always go
+to the provider.
+"""
+
+PROVIDER_MODELS = {
+    "openai": lambda: settings.OPENAI_MODEL,
+    "ollama": lambda: settings.OLLAMA_MODEL,
+    "local": lambda: settings.LOCAL_LLM_MODEL,
+}
+
+
+@dataclass(frozen=True)
+class CachedReply:
+    reply: str
+    provider: str
+
+
+def normalize_message(message: str) -> str:
+    # "What is the portfolio summary?" and "portfolio summary" share an entry.
+    terms = tokenize(message)
+    return " ".join(terms) if terms else " ".join(re.findall(r"\w+", message.lower()))
+
+
+def _sizeof(key: tuple, value: CachedReply) -> int:
+    # Rough footprint: string payloads plus per-entry overhead for the tuples.
+    return len(key[0]) + len(value.reply.encode()) + 200
+
+
+_cache: TTLCache[tuple, CachedReply] = TTLCache(
+    max_entries=settings.ASSISTANT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ASSISTANT_CACHE_TTL_SECONDS,
+    max_bytes=settings.ASSISTANT_CACHE_MAX_BYTES,
+    sizeof=_sizeof,
+)
+
+
+def cacheable(message: str, history: list[dict[str, str]]) -> bool:
+    return not any(turn.get("role") == "user" for turn in history) and bool(normalize_message(message))
+
+
+def cache_key(
+    message: str, history: list[dict[str, str]], user: User, provider: str, watermark: tuple
+) -> tuple | None:
+    """Key for this request, or None when the reply must not come from the cache.
+
+    ``watermark`` is the row from ``portfolio_watermark()``.
+    """
+    if not cacheable(message, history):
+        return None
+    normalized = normalize_message(message)
+    # Researchers only see their own projects; other roles share one scope per role.
+    scope = (user.role, user.id if user.role == "researcher" else None)
+    model = PROVIDER_MODELS[provider]()
+    digest = hashlib.sha256(normalized.encode()).hexdigest()
+    return (digest, scope, provider, model, *watermark, portfolio_version.current)
+
+
+def get(key: tuple | None) -> CachedReply | None:
+    if key is None:
+        return None
+    return _cache.get(key)
+
+
+def put(key: tuple | None, reply: str, provider: str) -> None:
+    # Fallback replies are never cached, so a recovered provider is used right away.
+    if key is None or provider == "fallback" or not reply.strip():
+        return
+    _cache.set(key, CachedReply(reply=reply, provider=provider))
+
+
+def stats() -> dict[str, Any]:
+    return {
+        "entries": len(_cache),
+        "bytes": _cache.bytes,
+        "max_bytes": _cache.max_bytes,
+        "hits": _cache.hits,
+        "misses": _cache.misses,
+        "evictions": _cache.evictions,
+    }
@@ -0,0 +1,232 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Literal
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.audit import ProjectFundingEvent, ProjectFundingMonthly
+from app.models.project import Project
+
+"""
+Funding ledger: events, running totals and monthly rollups.
+
+Recording funding touches three tables in one transaction:
+- a ProjectFundingEvent row (the ledger entry),
+- ``projects.funding_amount_sgd`` via ``SET funding = coalesce(funding, 0) + :amount``,
+  so concurrent posts can't overwrite each other's read-modify-write,
+- the (project, domain, month) row of ``project_funding_monthly`` via an upsert
+  that adds to ``amount_sgd`` and ``event_count``.
+
+``funding_timeseries`` answers spend-over-time from the rollup alone, so its cost
+grows with the number of months, not the number of events.
+"""
+
+Period = Literal["month", "quarter", "year"]
+
+
+@dataclass
+class TimeseriesPoint:
+    period: str
+    period_start: date
+    amount_sgd: Decimal
+    cumulative_sgd: Decimal
+    events: int
+
+
+def month_start(moment: datetime | date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def _period_start(month: date, period: Period) -> date:
+    if period == "year":
+        return date(month.year, 1, 1)
+    if period == "quarter":
+        return date(month.year, 3 * ((month.month - 1) // 3) + 1, 1)
+    return month
+
+
+def _period_label(start: date, period: Period) -> str:
+    if period == "year":
+        return str(start.year)
+    if period == "quarter":
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return f"{start.year}-{start.month:02d}"
+
+
+def _next_period(start: date, period: Period) -> date:
+    step = {"month": 1, "quarter": 3, "year": 12}[period]
+    months = start.year * 12 + start.month - 1 + step
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _add_to_rollup(db: Session, project_id: int, domain: str, month: date, amount: Decimal, events: int = 1) -> None:
+    values = {"project_id": project_id, "domain": domain, "month": month, "amount_sgd": amount, "event_count": events}
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert_fn = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert_fn(ProjectFundingMonthly).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProjectFundingMonthly.project_id, ProjectFundingMonthly.domain, ProjectFundingMonthly.month],
+            set_={
+                "amount_sgd": ProjectFundingMonthly.amount_sgd + stmt.excluded.amount_sgd,
+                "event_count": ProjectFundingMonthly.event_count + stmt.excluded.event_count,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    # No ON CONFLICT: increment in place, insert the bucket if it didn't exist yet.
+    result = db.execute(
+        update(ProjectFundingMonthly)
+        .where(
+            ProjectFundingMonthly.project_id == project_id,
+            ProjectFundingMonthly.domain == domain,
+            ProjectFundingMonthly.month == month,
+        )
+        .values(
+            amount_sgd=ProjectFundingMonthly.amount_sgd + amount,
+            event_count=ProjectFundingMonthly.event_count + events,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.execute(insert(ProjectFundingMonthly).values(values))
+
+
+def record_funding(
+    db: Session, project_id: int, domain: str, amount: Decimal, *, author_user_id: int, note: str | None
+) -> tuple[ProjectFundingEvent, Decimal]:
+    """Add a funding event and return it with the project's new running total.
+
+    Does not commit; the caller commits together with its audit row.
+    """
+    now = datetime.now(timezone.utc)
+    increment = (
+        update(Project)
+        .where(Project.id == project_id)
+        .values(funding_amount_sgd=func.coalesce(Project.funding_amount_sgd, 0) + amount)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        total = db.execute(increment.returning(Project.funding_amount_sgd)).scalar_one()
+    else:
+        db.execute(increment)
+        total = db.scalar(select(Project.funding_amount_sgd).where(Project.id == project_id))
+
+    event = ProjectFundingEvent(
+        project_id=project_id,
+        author_user_id=author_user_id,
+        amount_sgd=amount,
+        note=note,
+        created_at=now,
+    )
+    db.add(event)
+    _add_to_rollup(db, project_id, domain, month_start(now), amount)
+    return event, Decimal(total)
+
+
+def rebuild_funding_rollup(db: Session) -> int:
+    """Recompute project_funding_monthly from every funding event; returns the bucket count.
+
+    Attributes each event to the project's current domain, since the domain at
+    the time of older events was never recorded.
+    """
+    buckets: dict[tuple[int, str, date], list] = defaultdict(lambda: [Decimal(0), 0])
+    rows = db.execute(
+        select(ProjectFundingEvent.project_id, Project.domain, ProjectFundingEvent.created_at, ProjectFundingEvent.amount_sgd)
+        .join(Project, Project.id == ProjectFundingEvent.project_id)
+        .execution_options(yield_per=5000)
+    )
+    for project_id, domain, created_at, amount in rows:
+        bucket = buckets[(project_id, domain, month_start(created_at or datetime.now(timezone.utc)))]
+        bucket[0] += Decimal(amount or 0)
+        bucket[1] += 1
+
+    db.execute(delete(ProjectFundingMonthly))
+    if buckets:
+        db.execute(
+            insert(ProjectFundingMonthly),
+            [
+                {"project_id": pid, "domain": dom, "month": month, "amount_sgd": amount, "event_count": count}
+                for (pid, dom, month), (amount, count) in buckets.items()
+            ],
+        )
+    return len(buckets)
+
+
+def funding_timeseries(
+    db: Session,
+    *,
+    period: Period = "month",
+    domain: str | None = None,
+    project_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+) -> list[TimeseriesPoint]:
+    """Per-period and cumulative spend, gaps filled with zero-spend periods.
+
+    ``cumulative_sgd`` includes everything before ``start``, so it always equals
+    total recorded spend up to the end of that period.
+    """
+    filters = []
+    if domain:
+        filters.append(ProjectFundingMonthly.domain == domain)
+    if project_id is not None:
+        filters.append(ProjectFundingMonthly.project_id == project_id)
+
+    baseline = Decimal(0)
+    window = list(filters)
+    if start is not None:
+        first_month = _period_start(month_start(start), period)
+        window.append(ProjectFundingMonthly.month >= first_month)
+        baseline = Decimal(
+            db.scalar(
+                select(func.coalesce(func.sum(ProjectFundingMonthly.amount_sgd), 0)).where(
+                    *filters, ProjectFundingMonthly.month < first_month
+                )
+            )
+        )
+    if end is not None:
+        window.append(ProjectFundingMonthly.month <= month_start(end))
+
+    rows = db.execute(
+        select(
+            ProjectFundingMonthly.month,
+            func.sum(ProjectFundingMonthly.amount_sgd),
+            func.sum(ProjectFundingMonthly.event_count),
+        )
+        .where(*window)
+        .group_by(ProjectFundingMonthly.month)
+        .order_by(ProjectFundingMonthly.month)
+    ).all()
+    if not rows:
+        return []
+
+    per_period: dict[date, list] = defaultdict(lambda: [Decimal(0), 0])
+    for month, amount, events in rows:
+        bucket = per_period[_period_start(month, period)]
+        bucket[0] += Decimal(amount or 0)
+        bucket[1] += int(events or 0)
+
+    points: list[TimeseriesPoint] = []
+    cumulative = baseline
+    cursor = _period_start(month_start(start), period) if start is not None else min(per_period)
+    last = max(per_period)
+    while cursor <= last:
+        amount, events = per_period.get(cursor, (Decimal(0), 0))
+        cumulative += amount
+        points.append(
+            TimeseriesPoint(
+                period=_period_label(cursor, period),
+                period_start=cursor,
+                amount_sgd=amount,
+                cumulative_sgd=cumulative,
+                events=events,
+            )
+        )
+        cursor = _next_period(cursor, period)
+    return points
@@ -0,0 +1,196 @@
+import csv
+import io
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+from typing import IO, Any, Iterator
+
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit import AuditLog
+from app.models.project import Project
+
+ProjectKey = tuple[str, str]  # (title, institution)
+
+# Columns an ingest row is allowed to overwrite on an existing project.
+UPSERT_FIELDS = ("domain", "ai_type", "maturity_stage", "status", "funding_amount_sgd")
+
+
+@dataclass
+class IngestResult:
+    created: int = 0
+    updated: int = 0
+
+
+@dataclass
+class _ParsedRow:
+    key: ProjectKey
+    fields: dict[str, Any]
+    raw: dict[str, Any]
+
+
+def iter_csv_rows(raw: IO[bytes]) -> Iterator[dict[str, Any]]:
+    """Decode and parse a binary CSV stream incrementally.
+
+    The text wrapper pulls the upload in buffer-sized chunks, so memory stays
+    bounded by the batch size rather than the file size.
+    """
+    text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        # Hand the underlying file back untouched; the caller owns closing it.
+        text.detach()
+
+
+def _parse_row(row: dict[str, Any]) -> _ParsedRow | None:
+    title = (row.get("title") or "").strip()
+    institution = (row.get("institution") or "").strip()
+
+    # Blank rows (or rows missing the natural key) are skipped.
+    if not title or not institution:
+        return None
+
+    # Blank cells fall back to safe defaults so the NOT NULL columns are satisfied.
+    fields: dict[str, Any] = {
+        "domain": (row.get("domain") or "General").strip(),
+        "ai_type": (row.get("ai_type") or "Unknown").strip(),
+        "maturity_stage": (row.get("maturity_stage") or "Discovery").strip(),
+        "status": (row.get("status") or "Active").strip(),
+    }
+
+    funding_raw = (row.get("funding_amount_sgd") or "").strip()
+    if funding_raw:
+        try:
+            fields["funding_amount_sgd"] = float(funding_raw)
+        except ValueError:
+            pass
+
+    return _ParsedRow(key=(title, institution), fields=fields, raw=row)
+
+
+def existing_keys(db: Session, keys: list[ProjectKey]) -> dict[ProjectKey, int]:
+    rows = db.execute(
+        select(Project.id, Project.title, Project.institution).where(
+            tuple_(Project.title, Project.institution).in_(keys)
+        )
+    )
+    return {(title, institution): project_id for project_id, title, institution in rows}
+
+
+def _upsert_on_conflict(db: Session, values: list[dict[str, Any]]) -> dict[ProjectKey, int]:
+    dialect = db.get_bind().dialect.name
+    insert_fn = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    # Executed with a parameter list so SQLAlchemy batches it as "insertmanyvalues"
+    # while the statement itself stays cacheable across batches.
+    stmt = insert_fn(Project)
+    set_: dict[str, Any] = {name: stmt.excluded[name] for name in UPSERT_FIELDS}
+    # A blank funding cell must not wipe the amount already on record.
+    set_["funding_amount_sgd"] = func.coalesce(stmt.excluded.funding_amount_sgd, Project.funding_amount_sgd)
+    set_["updated_at"] = func.now()
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Project.title, Project.institution],
+        set_=set_,
+    ).returning(Project.id, Project.title, Project.institution)
+    return {(title, institution): project_id for project_id, title, institution in db.execute(stmt, values)}
+
+
+def _upsert_generic(
+    db: Session, values: list[dict[str, Any]], existing: dict[ProjectKey, int]
+) -> dict[ProjectKey, int]:
+    # Dialects without ON CONFLICT: one bulk UPDATE by primary key, one bulk INSERT.
+    changed = []
+    for v in values:
+        project_id = existing.get((v["title"], v["institution"]))
+        if project_id is None:
+            continue
+        params: dict[str, Any] = {"id": project_id}
+        params.update({k: v[k] for k in UPSERT_FIELDS if v[k] is not None})
+        changed.append(params)
+
+    new_rows = [v for v in values if (v["title"], v["institution"]) not in existing]
+    if changed:
+        db.execute(update(Project), changed)
+    if new_rows:
+        db.execute(insert(Project), new_rows)
+    return existing_keys(db, [(v["title"], v["institution"]) for v in values])
+
+
+def _upsert_batch(
+    db: Session, batch: list[_ParsedRow], actor_user_id: int, source: str, result: IngestResult
+) -> None:
+    # Duplicate keys inside one batch collapse to a single write (last row wins),
+    # which is also what ON CONFLICT requires.
+    merged: dict[ProjectKey, dict[str, Any]] = {}
+    for row in batch:
+        merged.setdefault(row.key, {}).update(row.fields)
+
+    existing = existing_keys(db, list(merged))
+
+    today = date.today()
+    values = [
+        {
+            "title": title,
+            "institution": institution,
+            # For MVP: ingested projects owned by the ingesting user to keep simple.
+            "owner_id": actor_user_id,
+            "start_date": today,
+            "funding_amount_sgd": None,
+            **fields,
+        }
+        for (title, institution), fields in merged.items()
+    ]
+
+    if db.get_bind().dialect.name in ("postgresql", "sqlite"):
+        ids = _upsert_on_conflict(db, values)
+    else:
+        ids = _upsert_generic(db, values, existing)
+
+    seen = set(existing)
+    for row in batch:
+        if row.key in seen:
+            result.updated += 1
+        else:
+            result.created += 1
+            seen.add(row.key)
+
+    db.execute(
+        insert(AuditLog),
+        [
+            {
+                "actor_user_id": actor_user_id,
+                "action": "INGEST",
+                "entity_type": "Project",
+                "entity_id": ids[row.key],
+                "diff_json": AuditLog.dumps({"source": source, "row": row.raw}),
+            }
+            for row in batch
+        ],
+    )
+
+
+def ingest_csv(
+    db: Session,
+    raw: IO[bytes],
+    *,
+    actor_user_id: int,
+    source: str,
+    batch_size: int | None = None,
+) -> IngestResult:
+    """Stream an AMGrant CSV into ``projects`` with one lookup and one upsert per batch.
+
+    Everything runs inside the caller's transaction; commit (or roll back) afterwards.
+    """
+    batch_size = batch_size or settings.INGEST_BATCH_SIZE
+    result = IngestResult()
+
+    parsed = (p for p in map(_parse_row, iter_csv_rows(raw)) if p is not None)
+    while batch := list(islice(parsed, batch_size)):
+        _upsert_batch(db, batch, actor_user_id, source, result)
+
+    return result
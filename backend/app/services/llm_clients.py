@@ -0,0 +1,182 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import LLM_ERRORS, LLM_REQUEST_DURATION, LLM_TIME_TO_FIRST_TOKEN
+
+"""
+Pooled HTTP clients for the assistant's LLM providers.
+
+Each provider gets one ``httpx.AsyncClient`` for the life of the process
+instead of one per chat request, with keep-alive, connection limits, optional
+HTTP/2 and separate connect/read timeouts taken from settings. Per-provider
+request, connection-reuse, latency and streaming time-to-first-token counters
+are reported on ``/api/v1/admin/stats``; latency, time to first token and errors also feed
+the Prometheus histograms on ``/metrics``.
+"""
+
+PROVIDERS = ("openai", "ollama", "local")
+
+
+@dataclass
+class ProviderStats:
+    requests: int = 0
+    errors: int = 0  # transport failures and HTTP error statuses
+    responses: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0  # responses that arrived without opening a TCP connection
+    connect_failures: int = 0  # requests that failed while opening a connection
+    latency_total_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    streams: int = 0
+    ttft_total_ms: float = 0.0
+    ttft_max_ms: float = 0.0
+
+    def record_latency(self, started: float) -> float:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.responses += 1
+        self.latency_total_ms += elapsed_ms
+        self.latency_max_ms = max(self.latency_max_ms, elapsed_ms)
+        return elapsed_ms
+
+    def record_ttft(self, elapsed_ms: float) -> None:
+        self.streams += 1
+        self.ttft_total_ms += elapsed_ms
+        self.ttft_max_ms = max(self.ttft_max_ms, elapsed_ms)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "connect_failures": self.connect_failures,
+            "latency_avg_ms": round(self.latency_total_ms / self.responses, 2) if self.responses else None,
+            "latency_max_ms": round(self.latency_max_ms, 2),
+            "streams": self.streams,
+            "ttft_avg_ms": round(self.ttft_total_ms / self.streams, 2) if self.streams else None,
+            "ttft_max_ms": round(self.ttft_max_ms, 2),
+        }
+
+
+class LLMClientRegistry:
+    """One long-lived ``httpx.AsyncClient`` per LLM provider.
+
+    Clients keep connections alive between chat requests, so only the first call
+    to a provider pays for TCP (and TLS) setup. Created lazily on first use and
+    closed by ``aclose()`` at application shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self.stats: dict[str, ProviderStats] = {name: ProviderStats() for name in PROVIDERS}
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            http2=settings.LLM_HTTP2,
+        )
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        # No await between the check and the insert, so concurrent requests on the
+        # event loop can't create duplicate clients.
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._new_client()
+            self._clients[provider] = client
+        return client
+
+    def _trace(self, provider: str, attempt: dict[str, bool]):
+        stats = self.stats[provider]
+
+        async def trace(event_name: str, _info: dict) -> None:
+            if event_name == "connection.connect_tcp.started":
+                attempt["connecting"] = True
+            elif event_name == "connection.connect_tcp.complete":
+                stats.new_connections += 1
+                attempt["connected"] = True
+
+        return trace
+
+    def _record_failure(self, provider: str, attempt: dict[str, bool]) -> None:
+        stats = self.stats[provider]
+        stats.errors += 1
+        if attempt.get("connecting") and not attempt.get("connected"):
+            stats.connect_failures += 1
+        LLM_ERRORS.labels(provider).inc()
+
+    def _record_response(self, provider: str, attempt: dict[str, bool], started: float) -> None:
+        # Only a request answered without starting a TCP connect rode on a pooled connection;
+        # DNS errors, refused connects and timeouts never count as reuse.
+        stats = self.stats[provider]
+        if not attempt.get("connecting"):
+            stats.reused_connections += 1
+        LLM_REQUEST_DURATION.labels(provider).observe(stats.record_latency(started) / 1000)
+
+    async def post(self, provider: str, url: str, **kwargs: Any) -> httpx.Response:
+        """POST through the provider's pooled client, recording latency and connection reuse."""
+        client = self.get(provider)
+        stats = self.stats[provider]
+        stats.requests += 1
+        attempt: dict[str, bool] = {}
+        started = time.perf_counter()
+        try:
+            resp = await client.post(url, extensions={"trace": self._trace(provider, attempt)}, **kwargs)
+        except Exception:
+            self._record_failure(provider, attempt)
+            raise
+        self._record_response(provider, attempt, started)
+        if resp.is_error:
+            stats.errors += 1
+            LLM_ERRORS.labels(provider).inc()
+        return resp
+
+    @asynccontextmanager
+    async def stream(self, provider: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+        """Streaming POST; yields a successful response whose body has not been read yet.
+
+        Latency here is time to response headers. Time to first token is up to the
+        caller, which knows how to parse the body (``record_ttft``).
+        """
+        client = self.get(provider)
+        stats = self.stats[provider]
+        stats.requests += 1
+        attempt: dict[str, bool] = {}
+        started = time.perf_counter()
+        try:
+            async with client.stream(
+                "POST", url, extensions={"trace": self._trace(provider, attempt)}, **kwargs
+            ) as resp:
+                self._record_response(provider, attempt, started)
+                if resp.is_error:
+                    # Read the error body so the connection can go back to the pool.
+                    await resp.aread()
+                resp.raise_for_status()
+                yield resp
+        except Exception:
+            self._record_failure(provider, attempt)
+            raise
+
+    def record_ttft(self, provider: str, elapsed_ms: float) -> None:
+        self.stats[provider].record_ttft(elapsed_ms)
+        LLM_TIME_TO_FIRST_TOKEN.labels(provider).observe(elapsed_ms / 1000)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+
+llm_clients = LLMClientRegistry()
@@ -0,0 +1,218 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Literal
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.audit import AuditLog, ProjectUpdate
+from app.models.project import Project
+from app.models.user import User
+from app.schemas.project import ProjectBatchUpdateItem, ProjectCreate
+from app.services.ingest import ProjectKey, existing_keys
+
+"""
+Batch create/update behind POST and PATCH /projects/batch.
+
+A batch is validated in one pass: one keyed lookup for (title, institution)
+conflicts, plus one query for the target rows of an update. The valid items are
+then written with bulk ORM statements and a single bulk audit insert, and
+committed once.
+
+Modes:
+- atomic: any invalid item fails the whole batch and nothing is written.
+- best_effort: invalid items are reported and skipped; the rest are applied.
+"""
+
+BatchMode = Literal["atomic", "best_effort"]
+
+DUPLICATE_KEY_ERROR = "A project with this title and institution already exists"
+
+# Columns an update may not set to null (the schema allows null to mean "unset" for optional fields).
+NOT_NULL_COLUMNS = frozenset(column.name for column in Project.__table__.c if not column.nullable)
+
+
+@dataclass
+class BatchItemResult:
+    index: int
+    status: Literal["created", "updated", "failed", "skipped"]
+    id: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class _Planned:
+    index: int
+    data: dict[str, Any]
+    id: int | None = None
+    completed: bool = False
+
+
+def _finish(
+    results: list[BatchItemResult | None], planned: list[_Planned], mode: BatchMode
+) -> tuple[list[BatchItemResult], list[_Planned]]:
+    """Fill in results for planned items; returns (results, items to write)."""
+    if mode == "atomic" and len(planned) < len(results):
+        for item in planned:
+            results[item.index] = BatchItemResult(item.index, "skipped", id=item.id, error="Batch not applied")
+        return results, []
+    return results, planned
+
+
+def _audit_rows(user: User, action: str, planned: list[_Planned]) -> list[dict[str, Any]]:
+    return [
+        {
+            "actor_user_id": user.id,
+            "action": action,
+            "entity_type": "Project",
+            "entity_id": item.id,
+            "diff_json": AuditLog.dumps(item.data) if item.data else None,
+        }
+        for item in planned
+    ]
+
+
+def create_projects(
+    db: Session, items: list[ProjectCreate], *, user: User, mode: BatchMode
+) -> list[BatchItemResult]:
+    results: list[BatchItemResult | None] = [None] * len(items)
+    first_index: dict[ProjectKey, int] = {}
+    candidates: list[tuple[ProjectKey, _Planned]] = []
+
+    today = date.today()
+    for index, item in enumerate(items):
+        data = item.model_dump()
+        # Project start is always tied to creation time, as in create_project.
+        data.pop("end_date", None)
+        data["start_date"] = today
+        key = (data["title"], data["institution"])
+        if key in first_index:
+            results[index] = BatchItemResult(
+                index, "failed", error=f"Duplicates the title and institution of item {first_index[key]}"
+            )
+            continue
+        first_index[key] = index
+        candidates.append((key, _Planned(index, data)))
+
+    taken = existing_keys(db, list(first_index)) if first_index else {}
+    planned: list[_Planned] = []
+    for key, item in candidates:
+        if key in taken:
+            results[item.index] = BatchItemResult(item.index, "failed", id=taken[key], error=DUPLICATE_KEY_ERROR)
+        else:
+            planned.append(item)
+
+    results, planned = _finish(results, planned, mode)
+    if not planned:
+        return results
+
+    ids = db.scalars(
+        insert(Project).returning(Project.id, sort_by_parameter_order=True),
+        [item.data | {"owner_id": user.id} for item in planned],
+    ).all()
+    for item, project_id in zip(planned, ids):
+        item.id = project_id
+        results[item.index] = BatchItemResult(item.index, "created", id=project_id)
+
+    db.execute(insert(AuditLog), _audit_rows(user, "CREATE", planned))
+    db.commit()
+    return results
+
+
+def update_projects(
+    db: Session, items: list[ProjectBatchUpdateItem], *, user: User, mode: BatchMode
+) -> list[BatchItemResult]:
+    results: list[BatchItemResult | None] = [None] * len(items)
+    current = {
+        row.id: row
+        for row in db.execute(
+            select(
+                Project.id,
+                Project.owner_id,
+                Project.title,
+                Project.institution,
+                Project.status,
+                Project.start_date,
+                Project.created_at,
+            ).where(Project.id.in_({item.id for item in items}))
+        )
+    }
+
+    first_index: dict[int, int] = {}
+    candidates: list[_Planned] = []
+    new_keys: dict[int, ProjectKey] = {}  # item index -> (title, institution) it renames to
+    for index, item in enumerate(items):
+        row = current.get(item.id)
+        error = None
+        if item.id in first_index:
+            error = f"Project {item.id} is already updated by item {first_index[item.id]}"
+        elif row is None:
+            error = "Project not found"
+        elif user.role == "researcher" and row.owner_id != user.id:
+            error = "Not allowed"
+        if error:
+            results[index] = BatchItemResult(index, "failed", id=item.id, error=error)
+            continue
+
+        # Same rules as update_project: dates are system-managed, Completed sets end_date.
+        data = item.model_dump(exclude_unset=True, exclude={"id"})
+        data.pop("start_date", None)
+        data.pop("end_date", None)
+        nulls = sorted(name for name, value in data.items() if value is None and name in NOT_NULL_COLUMNS)
+        if nulls:
+            error = f"{', '.join(nulls)} cannot be null"
+            results[index] = BatchItemResult(index, "failed", id=item.id, error=error)
+            continue
+        first_index[item.id] = index
+        planned = _Planned(index, data, id=item.id)
+
+        new_status = data.get("status")
+        if new_status == "Completed":
+            data["end_date"] = date.today()
+            planned.completed = row.status != "Completed"
+        elif new_status and row.status == "Completed":
+            data["end_date"] = None
+        if row.start_date is None and row.created_at is not None:
+            data["start_date"] = row.created_at.date()
+
+        if "title" in data or "institution" in data:
+            new_keys[index] = (data.get("title") or row.title, data.get("institution") or row.institution)
+        candidates.append(planned)
+
+    # A rename may not collide with another project, nor with another rename in this batch.
+    taken = existing_keys(db, list(set(new_keys.values()))) if new_keys else {}
+    claimed: dict[ProjectKey, int] = {}
+    planned_items: list[_Planned] = []
+    for item in candidates:
+        key = new_keys.get(item.index)
+        if key is not None:
+            owner = taken.get(key)
+            if (owner is not None and owner != item.id) or key in claimed:
+                results[item.index] = BatchItemResult(item.index, "failed", id=item.id, error=DUPLICATE_KEY_ERROR)
+                continue
+            claimed[key] = item.index
+        planned_items.append(item)
+
+    results, planned_items = _finish(results, planned_items, mode)
+    if not planned_items:
+        return results
+
+    changes = [{"id": item.id, **item.data} for item in planned_items if item.data]
+    if changes:
+        # ORM bulk UPDATE by primary key: rows with the same set of columns share one executemany.
+        db.execute(update(Project), changes)
+
+    completed = [
+        {"project_id": item.id, "author_user_id": user.id, "status": "Completed", "note": "Project marked as ended."}
+        for item in planned_items
+        if item.completed
+    ]
+    if completed:
+        db.execute(insert(ProjectUpdate), completed)
+
+    db.execute(insert(AuditLog), _audit_rows(user, "UPDATE", planned_items))
+    db.commit()
+
+    for item in planned_items:
+        results[item.index] = BatchItemResult(item.index, "updated", id=item.id)
+    return results
@@ -0,0 +1,204 @@
+import heapq
+import json
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import VersionedCache
+from app.db.data_version import portfolio_version, project_watermark
+from app.models.project import Project
+
+"""
+Lexical retrieval over project rows for the assistant prompt.
+
+An in-memory BM25 index of every project is built once per data version and
+shared by all requests. The version is the projects' database watermark (count
+and max(updated_at), so writes by other workers, the seed CLI or psql are seen)
+paired with the process write counter (writes within one timestamp tick). Each chat turn then picks the top-k rows
+relevant to the message (and, with less weight, recent history) and packs them
+into a token budget, so the prompt no longer grows with the portfolio.
+"""
+
+# Columns sent to the model for each selected project.
+CONTEXT_COLUMNS = (
+    "id",
+    "title",
+    "institution",
+    "domain",
+    "ai_type",
+    "maturity_stage",
+    "status",
+    "data_sensitivity",
+    "funding_amount_sgd",
+    "start_date",
+    "end_date",
+    "description",
+)
+# Fields whose words are indexed.
+INDEXED_COLUMNS = ("title", "institution", "domain", "ai_type", "maturity_stage", "status", "description")
+DESCRIPTION_CHARS = 400
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or our show tell "
+    "that the this to us we what which who with you your".split()
+)
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in re.findall(r"\w+", text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English/JSON; good enough for budgeting.
+    return len(text) // 4 + 1
+
+
+def _serialize_scalar(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+@dataclass
+class _Doc:
+    owner_id: int
+    row: dict[str, Any]
+    length: int
+
+
+@dataclass
+class ProjectIndex:
+    docs: list[_Doc] = field(default_factory=list)
+    postings: dict[str, list[tuple[int, int]]] = field(default_factory=dict)
+    avg_length: float = 0.0
+
+    @classmethod
+    def build(cls, rows) -> "ProjectIndex":
+        index = cls()
+        total_length = 0
+        for row in rows:
+            data = row._asdict()
+            owner_id = data.pop("owner_id")
+            terms = Counter(tokenize(" ".join(str(data[c] or "") for c in INDEXED_COLUMNS)))
+
+            serialized = {c: _serialize_scalar(data[c]) for c in CONTEXT_COLUMNS}
+            if serialized["description"] and len(serialized["description"]) > DESCRIPTION_CHARS:
+                serialized["description"] = serialized["description"][:DESCRIPTION_CHARS] + "..."
+
+            doc_id = len(index.docs)
+            length = sum(terms.values())
+            index.docs.append(_Doc(owner_id=owner_id, row=serialized, length=length))
+            total_length += length
+            for term, tf in terms.items():
+                index.postings.setdefault(term, []).append((doc_id, tf))
+
+        index.avg_length = total_length / len(index.docs) if index.docs else 0.0
+        return index
+
+    def search(self, weighted_terms: dict[str, float], k: int, owner_id: int | None = None) -> list[int]:
+        n = len(self.docs)
+        scores: dict[int, float] = {}
+        for term, weight in weighted_terms.items():
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                doc = self.docs[doc_id]
+                if owner_id is not None and doc.owner_id != owner_id:
+                    continue
+                norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * doc.length / (self.avg_length or 1))
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf * tf * (_BM25_K1 + 1) / (tf + norm)
+        return heapq.nlargest(k, scores, key=scores.__getitem__)
+
+
+_index_cache: VersionedCache[str, ProjectIndex] = VersionedCache()
+_build_lock = threading.Lock()
+
+
+def _index_version(db: Session) -> tuple:
+    return (*db.execute(project_watermark()).one(), portfolio_version.current)
+
+
+def get_project_index(db: Session) -> ProjectIndex:
+    version = _index_version(db)
+    index = _index_cache.get("projects", version)
+    if index is not None:
+        return index
+
+    # One rebuild at a time. While it runs, other requests keep using the previous
+    # index (a write or two behind) rather than queueing or re-reading every project.
+    if not _build_lock.acquire(blocking=False):
+        stale = _index_cache.peek("projects")
+        if stale is not None:
+            return stale
+        _build_lock.acquire()
+    try:
+        version = _index_version(db)
+        index = _index_cache.get("projects", version)
+        if index is not None:
+            return index
+        columns = [getattr(Project, c) for c in dict.fromkeys((*CONTEXT_COLUMNS, *INDEXED_COLUMNS, "owner_id"))]
+        rows = db.execute(select(*columns).order_by(Project.updated_at.desc(), Project.id.desc()))
+        index = ProjectIndex.build(rows)
+        _index_cache.set("projects", version, index)
+        return index
+    finally:
+        _build_lock.release()
+
+
+def query_terms(message: str, history: list[dict[str, str]]) -> dict[str, float]:
+    """Terms of the current message, plus recent user turns at half weight."""
+    weights: dict[str, float] = {}
+    for turn in history[-4:]:
+        if turn.get("role") == "user":
+            for term in tokenize(turn.get("content", "")):
+                weights[term] = max(weights.get(term, 0.0), 0.5)
+    for term in tokenize(message):
+        weights[term] = 1.0
+    return weights
+
+
+def select_context_rows(
+    db: Session,
+    message: str,
+    history: list[dict[str, str]],
+    *,
+    owner_id: int | None,
+    top_k: int,
+    token_budget: int,
+) -> list[dict[str, Any]]:
+    """Most relevant visible projects that fit in ``token_budget``.
+
+    With no lexical match (e.g. "give me an overview") the most recently updated
+    visible projects are used instead.
+    """
+    index = get_project_index(db)
+    doc_ids = index.search(query_terms(message, history), top_k, owner_id=owner_id)
+    if not doc_ids:
+        visible = (i for i, doc in enumerate(index.docs) if owner_id is None or doc.owner_id == owner_id)
+        doc_ids = list(islice(visible, top_k))
+
+    rows: list[dict[str, Any]] = []
+    used = 0
+    for doc_id in doc_ids:
+        row = index.docs[doc_id].row
+        cost = estimate_tokens(json.dumps(row, ensure_ascii=True))
+        if used + cost > token_budget:
+            break
+        rows.append(row)
+        used += cost
+    return rows
@@ -0,0 +1,148 @@
+"""Serialization cost of large list responses: FastAPI's default path vs. fast_json.
+
+Builds synthetic project and project-update rows (no database involved) and
+times, per page size, what happens between the route returning and the body
+being handed to the server:
+
+* ``default``: the route returns dicts / ORM objects, FastAPI validates them
+  against ``list[ProjectListItem]`` / ``list[ProjectUpdateOut]``, runs
+  ``jsonable_encoder`` and ``JSONResponse`` encodes the result with ``json``.
+* ``fast``: column tuples zipped into dicts and encoded with orjson
+  (``app.api.fast_json``), which is what the list routes now do.
+
+It also reports gzip / brotli time and size for the largest body at the levels
+the compression middleware uses.
+
+    cd backend
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --rows 1000 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import gzip
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api import fast_json
+from app.api.routes.projects import PROJECT_FIELDS
+from app.core.config import settings
+from app.models.audit import ProjectUpdate
+from app.schemas.project import ProjectListItem, ProjectUpdateOut
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+UPDATE_FIELDS = tuple(ProjectUpdateOut.model_fields)
+DOMAINS = ["Radiology", "Operations", "General Medicine", "ICU", "Oncology", "Pathology", "Cardiology"]
+STATUSES = ["Proposal", "Pilot", "Production", "Ended"]
+
+
+def project_rows(count: int, seed: int = 3) -> list[tuple]:
+    rnd = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        created = base + timedelta(minutes=rnd.randint(0, 500_000))
+        rows.append(
+            (
+                i + 1,
+                f"Project {i} sepsis early warning",
+                "SingHealth",
+                rnd.choice(DOMAINS),
+                "Tabular ML",
+                "Pilot",
+                rnd.choice(STATUSES),
+                "Restricted",
+                Decimal(rnd.randint(10_000, 2_000_000)).quantize(Decimal("0.01")),
+                date(2024, 1, 1) + timedelta(days=rnd.randint(0, 700)),
+                None,
+                "Predicts deterioration from vitals and labs for ward patients. " * 2,
+                1 + i % 20,
+                created,
+                created + timedelta(days=rnd.randint(0, 90)),
+            )
+        )
+    return rows
+
+
+def update_rows(count: int, seed: int = 4) -> list[tuple]:
+    rnd = random.Random(seed)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        (i + 1, 1 + i % 500, 1 + i % 20, rnd.choice(STATUSES), "Weekly progress note.", base + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+def default_path(field, content) -> bytes:
+    value = asyncio.run(serialize_response(field=field, response_content=content))
+    return JSONResponse(value).body
+
+
+def best_of(repeat: int, fn) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def report(label: str, count: int, seconds: float, body: bytes, baseline: float | None = None) -> None:
+    per_10k = seconds * 10_000 / count * 1000
+    speedup = f"  {baseline / seconds:5.1f}x" if baseline else ""
+    print(f"  {label:<28} {seconds * 1000:9.1f} ms  {per_10k:8.1f} ms/10k rows  {len(body) / 1024:8.0f} KiB{speedup}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    project_field = create_response_field(name="projects", type_=list[ProjectListItem], mode="serialization")
+    update_field = create_response_field(name="updates", type_=list[ProjectUpdateOut], mode="serialization")
+
+    largest = b""
+    for count in args.rows:
+        projects = project_rows(count)
+        updates = update_rows(count)
+        project_dicts = fast_json.rows_as_dicts(list(PROJECT_FIELDS), projects)
+        update_objects = [ProjectUpdate(**dict(zip(UPDATE_FIELDS, row))) for row in updates]
+
+        print(f"\n{count} rows")
+        base, body = best_of(args.repeat, lambda: default_path(project_field, project_dicts))
+        report("projects  default (dicts)", count, base, body)
+        fast, body = best_of(
+            args.repeat, lambda: fast_json.dumps(fast_json.rows_as_dicts(list(PROJECT_FIELDS), projects))
+        )
+        report("projects  fast_json", count, fast, body, base)
+        largest = body
+
+        base, body = best_of(args.repeat, lambda: default_path(update_field, update_objects))
+        report("updates   default (ORM)", count, base, body)
+        fast, body = best_of(
+            args.repeat, lambda: fast_json.dumps(fast_json.rows_as_dicts(list(UPDATE_FIELDS), updates))
+        )
+        report("updates   fast_json", count, fast, body, base)
+
+    print(f"\ncompression of the {args.rows[-1]}-row project body ({len(largest) / 1024:.0f} KiB)")
+    codecs = [("gzip", lambda: gzip.compress(largest, compresslevel=settings.GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        codecs.append(("br", lambda: brotli.compress(largest, quality=settings.BROTLI_QUALITY)))
+    for name, fn in codecs:
+        seconds, body = best_of(args.repeat, fn)
+        ratio = len(body) / len(largest) * 100
+        print(f"  {name:<6} {seconds * 1000:9.1f} ms  {len(body) / 1024:8.0f} KiB  ({ratio:.1f}% of original)")
+
+
+if __name__ == "__main__":
+    main()
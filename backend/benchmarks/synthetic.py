@@ -0,0 +1,56 @@
+"""Deterministic synthetic portfolios for the benchmarks.
+
+A thin wrapper over ``app.db.seed`` with the settings the benchmarks need to be
+comparable run to run: a fixed anchor date (rather than "now") and the
+categories and title words of ``infra/amgrant_mock_50rows.csv``. Each project
+gets project updates, funding events (with the monthly rollup) and audit rows;
+the same seed and sizes always produce the same rows.
+"""
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from app.db.seed import DEMO_USERS, Vocabulary, reset_schema, seed_portfolio, vocabulary_from_csv
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MOCK_CSV = os.path.join(REPO_DIR, "infra", "amgrant_mock_50rows.csv")
+
+ANCHOR = datetime(2025, 7, 1, tzinfo=timezone.utc)
+PASSWORD = "password"
+MANAGEMENT_EMAIL, RESEARCHER_EMAIL, ADMIN_EMAIL = (email for email, _name, _role in DEMO_USERS)
+
+
+@dataclass
+class Portfolio:
+    projects: int
+    rows: dict[str, int] = field(default_factory=dict)
+    rows_per_second: float = 0.0
+
+
+def mock_vocabulary() -> Vocabulary:
+    return vocabulary_from_csv(MOCK_CSV)
+
+
+def load_portfolio(
+    projects: int,
+    *,
+    users: int = 50,
+    updates_per_project: int = 3,
+    funding_per_project: int = 2,
+    audit_per_project: int = 4,
+    seed: int = 1,
+) -> Portfolio:
+    """Reset the database and bulk-load a synthetic portfolio of ``projects`` projects."""
+    reset_schema()
+    stats = seed_portfolio(
+        projects,
+        users=users,
+        updates_per_project=updates_per_project,
+        funding_per_project=funding_per_project,
+        audit_per_project=audit_per_project,
+        seed=seed,
+        anchor=ANCHOR,
+        password=PASSWORD,
+        vocabulary=mock_vocabulary(),
+    )
+    return Portfolio(projects=projects, rows=stats.rows, rows_per_second=stats.rows_per_second)
@@ -1,7 +1,9 @@
 import axios from 'axios'
 
+const baseURL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1'
+
 const api = axios.create({
-  baseURL: import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1'
+  baseURL
 })
 
 api.interceptors.request.use((config) => {
@@ -14,3 +16,35 @@ api.interceptors.request.use((config) => {
 })
 
 export default api
+
+// axios can't read a response body incrementally in the browser, so streaming
+// endpoints (newline-delimited JSON) go through fetch and call onEvent per line.
+export async function streamPost(path: string, body: unknown, onEvent: (event: any) => void) {
+  const token = localStorage.getItem('agm_token')
+  const res = await fetch(`${baseURL}${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {})
+    },
+    body: JSON.stringify(body)
+  })
+  if (!res.ok || !res.body) {
+    const data = await res.json().catch(() => null)
+    throw new Error(data?.detail || `Request failed (${res.status})`)
+  }
+
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { done, value } = await reader.read()
+    buffer += decoder.decode(value, { stream: !done })
+    const lines = buffer.split('\n')
+    buffer = done ? '' : lines.pop() ?? ''
+    for (const line of lines) {
+      if (line.trim()) onEvent(JSON.parse(line))
+    }
+    if (done) break
+  }
+}
@@ -1,5 +1,5 @@
 import React, { useEffect, useMemo, useRef, useState } from 'react'
-import api from '../api'
+import { streamPost } from '../api'
 
 type ChatRole = 'user' | 'assistant'
 
@@ -50,28 +50,31 @@ export default function AssistantChat() {
     setMessages((prev) => [...prev, userMessage])
     setSending(true)
 
-    try {
-      const res = await api.post('/assistant/chat', {
-        message: text,
-        history: historyForApi.slice(-12),
-        mode: CHAT_MODE
-      })
+    // The reply streams in as newline-delimited JSON events; show tokens as they arrive.
+    const replyId = makeId()
+    let reply = ''
+    setMessages((prev) => [...prev, { id: replyId, role: 'assistant', content: '' }])
+    const showReply = (content: string) =>
+      setMessages((prev) => prev.map((m) => (m.id === replyId ? { ...m, content } : m)))
 
-      const reply = typeof res.data?.reply === 'string' && res.data.reply.trim()
-        ? res.data.reply.trim()
-        : 'I could not generate a response. Please try again.'
+    try {
+      await streamPost(
+        '/assistant/chat/stream',
+        { message: text, history: historyForApi.slice(-12), mode: CHAT_MODE },
+        (event) => {
+          if (event.type === 'token' && typeof event.content === 'string') {
+            reply += event.content
+            showReply(reply)
+          } else if (event.type === 'error') {
+            setError(event.detail || 'Assistant response was interrupted')
+          }
+        }
+      )
 
-      setMessages((prev) => [...prev, { id: makeId(), role: 'assistant', content: reply }])
+      if (!reply.trim()) showReply('I could not generate a response. Please try again.')
     } catch (e: any) {
-      setError(e?.response?.data?.detail || 'Assistant request failed')
-      setMessages((prev) => [
-        ...prev,
-        {
-          id: makeId(),
-          role: 'assistant',
-          content: 'I cannot reach the assistant service right now. Please try again.'
-        }
-      ])
+      setError(e?.message || 'Assistant request failed')
+      if (!reply) showReply('I cannot reach the assistant service right now. Please try again.')
     } finally {
       setSending(false)
     }
@@ -85,7 +88,7 @@ export default function AssistantChat() {
       </div>
 
       <div className="h-[420px] space-y-3 overflow-y-auto px-4 py-3">
-        {messages.map((m) => (
+        {messages.filter((m) => m.content).map((m) => (
           <div key={m.id} className={m.role === 'user' ? 'flex justify-end' : 'flex justify-start'}>
             <div
               className={
@@ -98,7 +101,7 @@ export default function AssistantChat() {
             </div>
           </div>
         ))}
-        {sending ? (
+        {sending && messages[messages.length - 1]?.content === '' ? (
           <div className="flex justify-start">
             <div className="rounded-xl bg-gray-100 px-3 py-2 text-sm text-gray-600">Thinking…</div>
           </div>
@@ -33,6 +33,18 @@ type ProjectCycle = {
   spent_sgd: number
 }
 
+type ProjectCyclePage = {
+  items: ProjectCycle[]
+  next_cursor?: string | null
+}
+type CycleDurationStats = {
+  key: string
+  count: number
+  p50_days: number
+  p90_days: number
+  max_days: number
+}
+
 type PortfolioSnapshot = {
   total_projects: number
   active_projects: number
@@ -40,18 +52,31 @@ type PortfolioSnapshot = {
   by_institution: CountByKey[]
   by_domain: CountByKey[]
   funding_by_domain: FundingByKey[]
-  project_cycles: ProjectCycle[]
+  cycle_duration_by_domain: CycleDurationStats[]
 }
 
+const CYCLE_PAGE_SIZE = 50
+
 export default function Dashboard() {
   const [data, setData] = useState<PortfolioSnapshot | null>(null)
   const [error, setError] = useState<string | null>(null)
+  const [projectCycles, setProjectCycles] = useState<ProjectCycle[]>([])
+  const [cycleCursor, setCycleCursor] = useState<string | null>(null)
+
+  async function loadCycles(cursor: string | null) {
+    const res = await api.get<ProjectCyclePage>('/analytics/project-cycles', {
+      params: { limit: CYCLE_PAGE_SIZE, ...(cursor ? { cursor } : {}) }
+    })
+    setProjectCycles((prev) => (cursor ? [...prev, ...res.data.items] : res.data.items))
+    setCycleCursor(res.data.next_cursor || null)
+  }
 
   useEffect(() => {
     ;(async () => {
       try {
         const res = await api.get('/analytics/portfolio')
         setData(res.data)
+        await loadCycles(null)
         setError(null)
       } catch (e: any) {
         setError(e?.response?.data?.detail || 'Unable to load dashboard (management/admin only).')
@@ -61,7 +86,7 @@ export default function Dashboard() {
 
   const domainData = useMemo(() => data?.by_domain || [], [data])
   const fundingByDomain = useMemo(() => data?.funding_by_domain || [], [data])
-  const projectCycles = useMemo(() => data?.project_cycles || [], [data])
+  const cycleStats = useMemo(() => data?.cycle_duration_by_domain || [], [data])
 
   return (
     <div className="space-y-6">
@@ -119,7 +144,35 @@ export default function Dashboard() {
           </div>
 
           <div className="rounded-2xl bg-white p-4 shadow-sm ring-1 ring-gray-200">
-            <div className="text-sm font-semibold">Project lifecycle table (each project timeline)</div>
+            <div className="text-sm font-semibold">Cycle duration by domain (days)</div>
+            <div className="mt-3 overflow-x-auto">
+              <table className="w-full min-w-[520px] text-sm">
+                <thead className="bg-gray-50 text-left text-xs text-gray-600">
+                  <tr>
+                    <th className="px-3 py-2">Domain</th>
+                    <th className="px-3 py-2">Projects</th>
+                    <th className="px-3 py-2">Median</th>
+                    <th className="px-3 py-2">P90</th>
+                    <th className="px-3 py-2">Longest</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {cycleStats.map((item) => (
+                    <tr key={item.key} className="border-t">
+                      <td className="px-3 py-2 font-medium">{item.key}</td>
+                      <td className="px-3 py-2">{item.count}</td>
+                      <td className="px-3 py-2">{Math.round(item.p50_days)}</td>
+                      <td className="px-3 py-2">{Math.round(item.p90_days)}</td>
+                      <td className="px-3 py-2">{item.max_days}</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+            </div>
+          </div>
+
+          <div className="rounded-2xl bg-white p-4 shadow-sm ring-1 ring-gray-200">
+            <div className="text-sm font-semibold">Project lifecycle table (longest running first)</div>
             <div className="mt-3 overflow-x-auto">
               <table className="w-full min-w-[760px] text-sm">
                 <thead className="bg-gray-50 text-left text-xs text-gray-600">
@@ -152,6 +205,14 @@ export default function Dashboard() {
                 </tbody>
               </table>
             </div>
+            {cycleCursor ? (
+              <button
+                className="mt-3 rounded-lg px-3 py-2 text-sm ring-1 ring-gray-200 hover:bg-gray-50"
+                onClick={() => loadCycles(cycleCursor)}
+              >
+                Load more
+              </button>
+            ) : null}
           </div>
         </>
       ) : (
@@ -14,18 +14,26 @@ type Project = {
   updated_at: string
 }
 
+// Only the columns this table renders; the server skips the rest (e.g. description).
+const LIST_FIELDS = 'id,title,institution,domain,ai_type,status,funding_amount_sgd,updated_at'
+const PAGE_SIZE = 100
+
 export default function Projects() {
   const navigate = useNavigate()
   const [rows, setRows] = useState<Project[]>([])
   const [q, setQ] = useState('')
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
 
   const filtered = useMemo(() => rows, [rows])
 
-  async function load() {
+  async function load(cursor: string | null = null) {
     setLoading(true)
-    const res = await api.get('/projects', { params: q ? { q } : {} })
-    setRows(res.data)
+    const res = await api.get('/projects', {
+      params: { ...(q ? { q } : {}), ...(cursor ? { cursor } : {}), fields: LIST_FIELDS, limit: PAGE_SIZE }
+    })
+    setRows((prev) => (cursor ? [...prev, ...res.data] : res.data))
+    setNextCursor(res.headers['x-next-cursor'] || null)
     setLoading(false)
   }
 
@@ -64,7 +72,7 @@ export default function Projects() {
             </tr>
           </thead>
           <tbody>
-            {loading ? (
+            {loading && rows.length === 0 ? (
               <tr><td className="px-4 py-4 text-gray-600" colSpan={6}>Loading…</td></tr>
             ) : filtered.length === 0 ? (
               <tr><td className="px-4 py-4 text-gray-600" colSpan={6}>No projects yet.</td></tr>
@@ -96,6 +104,16 @@ export default function Projects() {
           </tbody>
         </table>
       </div>
+
+      {nextCursor ? (
+        <button
+          className="rounded-lg border bg-white px-3 py-2 text-sm disabled:opacity-50"
+          disabled={loading}
+          onClick={() => load(nextCursor)}
+        >
+          Load more
+        </button>
+      ) : null}
     </div>
   )
 }